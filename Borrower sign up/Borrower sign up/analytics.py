@@ -0,0 +1,178 @@
+"""
+Risk analytics for LoanPro
+Distributions of loan amount, income, eligibility and loan-to-income ratio,
+broken down by state, employment status and loan purpose.
+
+Everything is computed with a handful of SQL aggregates over
+loan_applications joined with eligibility_checks, and cached until the
+applications table changes.
+"""
+
+import threading
+from datetime import datetime
+
+from sqlalchemy import text
+
+DIMENSIONS = ('state', 'employment_status', 'loan_purpose')
+
+# Metric name -> (SQL expression over the joined row, histogram bucket edges, scale)
+# Money is aggregated as integer paise; edges and results are reported in
+# rupees by dividing by the scale.
+METRICS = {
+    'loan_amount': ('la.loan_amount_paise',
+                    [0, 100000, 250000, 500000, 1000000, 2500000, 5000000, 10000000], 100),
+    'annual_income': ('la.annual_income_paise',
+                      [0, 200000, 300000, 500000, 1000000, 2000000, 5000000], 100),
+    'eligibility_percentage': ('ec.percentage',
+                               [0, 10, 20, 30, 40, 50, 60, 70, 80, 90], 1),
+    'loan_to_income_ratio': ('la.loan_amount_paise * 1.0 / NULLIF(la.annual_income_paise, 0)',
+                             [0, 1, 2, 3, 5, 8, 12], 1),
+}
+
+PERCENTILES = (25, 50, 75, 90)
+
+_cache = {'watermark': None, 'result': None}
+_cache_lock = threading.Lock()
+
+
+def _grouped_cte():
+    """Flatten every application once per breakdown so one GROUP BY covers them all"""
+    columns = ', '.join(f"{expr} AS {name}" for name, (expr, _edges, _scale) in METRICS.items())
+    base = f"""
+        base AS (
+            SELECT la.state, la.employment_status, la.loan_purpose, la.status, {columns}
+            FROM loan_applications la
+            LEFT JOIN eligibility_checks ec ON ec.application_id = la.id
+        )"""
+    metric_names = ', '.join(METRICS)
+    selects = [f"SELECT 'all' AS dimension, 'all' AS grp, status, {metric_names} FROM base"]
+    selects += [f"SELECT '{dim}', {dim}, status, {metric_names} FROM base" for dim in DIMENSIONS]
+    return f"WITH {base}, grouped AS ({' UNION ALL '.join(selects)})"
+
+
+def _aggregate_sql():
+    columns = [
+        "COUNT(*) AS count",
+        "SUM(status = 'approved') AS approved",
+        "SUM(status = 'rejected') AS rejected",
+    ]
+    for name, (_expr, edges, scale) in METRICS.items():
+        columns += [f"MIN({name}) AS {name}_min", f"MAX({name}) AS {name}_max", f"AVG({name}) AS {name}_mean"]
+        for index, low in enumerate(edges):
+            if index + 1 < len(edges):
+                condition = f"{name} >= {low * scale} AND {name} < {edges[index + 1] * scale}"
+            else:
+                condition = f"{name} >= {low * scale}"
+            columns.append(f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END) AS {name}_bucket_{index}")
+
+    return f"""
+        {_grouped_cte()}
+        SELECT dimension, grp, {', '.join(columns)}
+        FROM grouped
+        GROUP BY dimension, grp
+    """
+
+
+def _percentile_sql(metric):
+    # Nearest-rank percentile: rank = ceil(n * p / 100), in integer arithmetic
+    ranks = ', '.join(f"MAX(1, (n * {p} + 99) / 100)" for p in PERCENTILES)
+    return f"""
+        {_grouped_cte()},
+        ranked AS (
+            SELECT dimension, grp, {metric} AS value,
+                   ROW_NUMBER() OVER (PARTITION BY dimension, grp ORDER BY {metric}) AS rn,
+                   COUNT(*) OVER (PARTITION BY dimension, grp) AS n
+            FROM grouped
+            WHERE {metric} IS NOT NULL
+        )
+        SELECT dimension, grp, rn, n, value
+        FROM ranked
+        WHERE rn IN ({ranks})
+    """
+
+
+def get_watermark(session):
+    """Cheap fingerprint of the applications table - changes on insert, update or delete"""
+    row = session.execute(text(
+        "SELECT COUNT(*), MAX(updated_at) FROM loan_applications"
+    )).one()
+    return (row[0], str(row[1]))
+
+
+def compute_analytics(session):
+    """Run the aggregate and percentile queries and assemble the report"""
+    groups = {}
+
+    for row in session.execute(text(_aggregate_sql())).mappings():
+        decided = (row['approved'] or 0) + (row['rejected'] or 0)
+        stats = {
+            'count': row['count'],
+            'approved': row['approved'] or 0,
+            'rejected': row['rejected'] or 0,
+            'approval_rate': round((row['approved'] or 0) / decided, 4) if decided else None,
+            'metrics': {},
+        }
+        for name, (_expr, edges, scale) in METRICS.items():
+            histogram = []
+            for index, low in enumerate(edges):
+                histogram.append({
+                    'min': low,
+                    'max': edges[index + 1] if index + 1 < len(edges) else None,
+                    'count': row[f"{name}_bucket_{index}"] or 0,
+                })
+            stats['metrics'][name] = {
+                'min': _number(row[f"{name}_min"], scale),
+                'max': _number(row[f"{name}_max"], scale),
+                'mean': _number(row[f"{name}_mean"], scale),
+                'percentiles': {},
+                'histogram': histogram,
+            }
+        groups[(row['dimension'], row['grp'])] = stats
+
+    for name, (_expr, _edges, scale) in METRICS.items():
+        for row in session.execute(text(_percentile_sql(name))).mappings():
+            stats = groups.get((row['dimension'], row['grp']))
+            if stats is None:
+                continue
+            for p in PERCENTILES:
+                if row['rn'] == max(1, (row['n'] * p + 99) // 100):
+                    stats['metrics'][name]['percentiles'][f"p{p}"] = _number(row['value'], scale)
+
+    empty = {'count': 0, 'approved': 0, 'rejected': 0, 'approval_rate': None, 'metrics': {}}
+    report = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'overall': groups.pop(('all', 'all'), empty),
+    }
+    for dim in DIMENSIONS:
+        report[f"by_{dim}"] = {
+            grp: stats for (dimension, grp), stats in sorted(groups.items(), key=lambda item: str(item[0][1]))
+            if dimension == dim
+        }
+    return report
+
+
+def get_analytics(session):
+    """Return the cached report, recomputing only if the watermark moved"""
+    watermark = get_watermark(session)
+    with _cache_lock:
+        if _cache['watermark'] == watermark:
+            return _cache['result']
+
+    result = compute_analytics(session)
+    with _cache_lock:
+        _cache['watermark'] = watermark
+        _cache['result'] = result
+    return result
+
+
+def invalidate():
+    """Drop the cached report (e.g. after a bulk import)"""
+    with _cache_lock:
+        _cache['watermark'] = None
+        _cache['result'] = None
+
+
+def _number(value, scale=1):
+    if value is None:
+        return None
+    return round(value / scale, 4)
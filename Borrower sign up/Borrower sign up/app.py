@@ -1,21 +1,78 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, date
+from datetime import datetime, timedelta
 import os
 from werkzeug.security import generate_password_hash, check_password_hash
 import uuid
-import re
+import base64
 from decimal import Decimal
 from sqlalchemy import Numeric  # Add this import
+from ratelimit import TokenBucketLimiter, NegativeCache
+import assets
+import compression
+import money
+import listing
+import validation
+from validation import calculate_age
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-local-secret-key-12345'
 # LOCAL SQLite database - no network required
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///loanpro.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('LOANPRO_DATABASE_URI', 'sqlite:///loanpro.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Admission control - (tokens per second, burst) per client and route
+app.config['RATE_LIMIT_FILE'] = 'ratelimit.db'
+app.config['RATE_LIMITS'] = {
+    'submit_application': (0.1, 5),
+    'check_status': (0.5, 10),
+    'search_application': (0.5, 10),
+    'application_status': (1, 20),
+    'api_get_application': (1, 20),
+    'api_get_application_timeline': (1, 20),
+    'api_eligibility_preview': (2, 30),
+    'api_validate_application': (5, 50),
+}
+
 db = SQLAlchemy(app)
 
+# Rows per page when the admin list is ordered by eligibility
+app.config['ADMIN_PAGE_SIZE'] = 50
+
+# application_logs older than this are moved to monthly archive segments
+app.config['LOG_RETENTION_DAYS'] = 180
+app.config['LOG_ARCHIVE_DIR'] = os.path.join(app.instance_path, 'log_archive')
+
+# Online backups - set LOANPRO_BACKUP_INTERVAL (seconds) to enable the background task
+app.config['BACKUP_DIR'] = os.path.join(app.instance_path, 'backups')
+app.config['BACKUP_INTERVAL_SECONDS'] = int(os.environ.get('LOANPRO_BACKUP_INTERVAL', '0'))
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers (including online backups) run without blocking writers"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+# Fingerprinted static assets (build with `python assets.py`)
+assets.init_app(app)
+
+# gzip/brotli for HTML and JSON responses
+app.config['COMPRESS_MIN_SIZE'] = 500
+compression.init_app(app)
+
+os.makedirs(app.instance_path, exist_ok=True)
+limiter = TokenBucketLimiter(os.path.join(app.instance_path, app.config['RATE_LIMIT_FILE']))
+# Application IDs recently looked up and not found
+missing_application_ids = NegativeCache(maxsize=10000, ttl=300)
+# Listing columns for the admin views, refreshed from updated_at on each request
+application_listing = listing.ApplicationListing()
+
 # Database Models
 class LoanApplication(db.Model):
     __tablename__ = 'loan_applications'
@@ -38,8 +95,8 @@ class LoanApplication(db.Model):
     
     # Financial Information
     employment_status = db.Column(db.String(50), nullable=False)
-    annual_income = db.Column(Numeric(12, 2), nullable=False)  # Changed from db.Decimal to Numeric
-    loan_amount = db.Column(Numeric(12, 2), nullable=False)    # Changed from db.Decimal to Numeric
+    annual_income_paise = db.Column(db.Integer, nullable=False)  # Integer paise - see money.py
+    loan_amount_paise = db.Column(db.Integer, nullable=False)
     loan_purpose = db.Column(db.String(100), nullable=False)
     
     # Application Status
@@ -49,7 +106,17 @@ class LoanApplication(db.Model):
     
     # Relationships
     eligibility = db.relationship('EligibilityCheck', backref='application', uselist=False, cascade='all, delete-orphan')
-    logs = db.relationship('ApplicationLog', backref='application', cascade='all, delete-orphan')
+    # Dynamic so the full history is never loaded by accident - use get_application_timeline()
+    logs = db.relationship('ApplicationLog', backref='application', cascade='all, delete-orphan',
+                           lazy='dynamic', order_by='ApplicationLog.timestamp.desc()')
+    
+    # Keep in step with migrations.py, which adds these to existing databases
+    __table_args__ = (
+        db.Index('ix_loan_applications_status_created_at', 'status', 'created_at'),
+        db.Index('ix_loan_applications_created_at', 'created_at'),
+        db.Index('ix_loan_applications_updated_at', 'updated_at'),
+        db.Index('ix_loan_applications_email', 'email'),
+    )
 
 class EligibilityCheck(db.Model):
     __tablename__ = 'eligibility_checks'
@@ -69,6 +136,11 @@ class EligibilityCheck(db.Model):
     status = db.Column(db.String(20), default='pending')
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_eligibility_checks_application_id', 'application_id'),
+        db.Index('ix_eligibility_checks_percentage_application_id', 'percentage', 'application_id'),
+    )
 
 class ApplicationLog(db.Model):
     __tablename__ = 'application_logs'
@@ -79,14 +151,17 @@ class ApplicationLog(db.Model):
     action = db.Column(db.String(50), nullable=False)
     details = db.Column(db.Text)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_application_logs_application_id_timestamp', 'application_id', 'timestamp'),
+        db.Index('ix_application_logs_timestamp', 'timestamp'),
+    )
 
 # Template Filters
 @app.template_filter('currency')
-def currency_filter(amount):
-    """Format amount as Indian Rupees"""
-    if amount is None:
-        return "₹0"
-    return f"₹{amount:,.2f}"
+def currency_filter(paise, decimals=2):
+    """Format an amount in paise as Indian Rupees"""
+    return money.format_paise(paise, decimals)
 
 @app.template_filter('date')
 def date_filter(date_obj):
@@ -126,26 +201,26 @@ def generate_application_id():
     random_part = str(uuid.uuid4())[:8].upper()
     return f"LA{timestamp}{random_part}"
 
-def calculate_age(birth_date):
-    """Calculate age from birth date"""
-    today = date.today()
-    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+# Loan-to-income bands: (max loan as a multiple of annual income, score).
+# Loans above the last multiple score LOAN_TO_INCOME_FLOOR_SCORE.
+LOAN_TO_INCOME_BANDS = ((3, 20), (5, 15), (8, 10))
+LOAN_TO_INCOME_FLOOR_SCORE = 5
 
-def validate_phone(phone):
-    """Validate Indian phone number"""
-    pattern = r'^[6-9]\d{9}$'
-    return re.match(pattern, phone) is not None
+ELIGIBILITY_STATUSES = ('highly_eligible', 'eligible', 'moderately_eligible', 'not_eligible')
 
-def validate_email(email):
-    """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+# Percentage range of each eligibility status: (inclusive min, exclusive max)
+ELIGIBILITY_BANDS = {
+    'highly_eligible': (70, None),
+    'eligible': (50, 70),
+    'moderately_eligible': (30, 50),
+    'not_eligible': (None, 30),
+}
 
-def check_eligibility(application):
-    """Calculate loan eligibility based on various factors"""
+def base_eligibility_scores(date_of_birth, annual_income, employment_status):
+    """Age, income and employment scores - everything except the loan amount"""
     
     # Age Score (18-65 years optimal)
-    age = calculate_age(application.date_of_birth)
+    age = calculate_age(date_of_birth)
     if 25 <= age <= 55:
         age_score = 25
     elif 18 <= age <= 65:
@@ -153,15 +228,14 @@ def check_eligibility(application):
     else:
         age_score = 10
     
-    # Income Score
-    annual_income = float(application.annual_income)
-    if annual_income >= 1000000:  # 10 Lakhs+
+    # Income Score (amounts in paise)
+    if annual_income >= 1000000_00:  # 10 Lakhs+
         income_score = 30
-    elif annual_income >= 500000:  # 5 Lakhs+
+    elif annual_income >= 500000_00:  # 5 Lakhs+
         income_score = 25
-    elif annual_income >= 300000:  # 3 Lakhs+
+    elif annual_income >= 300000_00:  # 3 Lakhs+
         income_score = 20
-    elif annual_income >= 200000:  # 2 Lakhs+
+    elif annual_income >= 200000_00:  # 2 Lakhs+
         income_score = 15
     else:
         income_score = 10
@@ -174,44 +248,76 @@ def check_eligibility(application):
         'retired': 15,
         'unemployed': 5
     }
-    employment_score = employment_scores.get(application.employment_status, 10)
-    
-    # Loan to Income Ratio Score
-    loan_amount = float(application.loan_amount)
-    loan_to_income_ratio = loan_amount / annual_income
-    
-    if loan_to_income_ratio <= 3:
-        loan_to_income_score = 20
-    elif loan_to_income_ratio <= 5:
-        loan_to_income_score = 15
-    elif loan_to_income_ratio <= 8:
-        loan_to_income_score = 10
-    else:
-        loan_to_income_score = 5
-    
-    # Calculate total score and percentage
-    total_score = age_score + income_score + employment_score + loan_to_income_score
-    percentage = (total_score / 100) * 100
-    
-    # Determine eligibility status
-    if percentage >= 70:
-        status = 'highly_eligible'
-    elif percentage >= 50:
-        status = 'eligible'
-    elif percentage >= 30:
-        status = 'moderately_eligible'
-    else:
-        status = 'not_eligible'
+    employment_score = employment_scores.get(employment_status, 10)
     
     return {
         'age_score': age_score,
         'income_score': income_score,
         'employment_score': employment_score,
-        'loan_to_income_score': loan_to_income_score,
+    }
+
+def loan_to_income_score(loan_amount, annual_income):
+    """Score the loan against income - compared as integers, so no rounding at the breakpoints"""
+    for multiple, score in LOAN_TO_INCOME_BANDS:
+        if loan_amount <= multiple * annual_income:
+            return score
+    return LOAN_TO_INCOME_FLOOR_SCORE
+
+def eligibility_status(percentage):
+    if percentage >= 70:
+        return 'highly_eligible'
+    elif percentage >= 50:
+        return 'eligible'
+    elif percentage >= 30:
+        return 'moderately_eligible'
+    return 'not_eligible'
+
+def score_eligibility(base_scores, loan_amount, annual_income):
+    """Combine the base scores with the loan-to-income score for one loan amount"""
+    result = dict(base_scores)
+    result['loan_to_income_score'] = loan_to_income_score(loan_amount, annual_income)
+    
+    # Calculate total score and percentage
+    total_score = sum(result.values())
+    percentage = (total_score / 100) * 100
+    
+    result.update({
         'total_score': total_score,
         'percentage': percentage,
-        'status': status
-    }
+        'status': eligibility_status(percentage)
+    })
+    return result
+
+def check_eligibility(application):
+    """Calculate loan eligibility based on various factors"""
+    base_scores = base_eligibility_scores(
+        application.date_of_birth, application.annual_income_paise, application.employment_status
+    )
+    return score_eligibility(base_scores, application.loan_amount_paise, application.annual_income_paise)
+
+def max_loan_by_status(base_scores, annual_income):
+    """Largest loan amount (paise) that still gets each eligibility status.
+    
+    Only the loan-to-income score depends on the amount, and it only changes
+    at the band multiples, so the answer for each status is one of those
+    breakpoints (or the loan limit) - no need to try amounts one by one.
+    Statuses no allowed amount can reach are left out.
+    """
+    base_total = sum(base_scores.values())
+    breakpoints = [(multiple * annual_income, score) for multiple, score in LOAN_TO_INCOME_BANDS]
+    breakpoints.append((validation.MAX_LOAN_PAISE, LOAN_TO_INCOME_FLOOR_SCORE))
+    
+    max_amounts = {}
+    lower = 0  # each band covers (previous breakpoint, its own breakpoint]
+    for upper, score in breakpoints:
+        band_lower, lower = lower, max(lower, upper)
+        # Skip bands that lie wholly outside the allowed loan range
+        if band_lower >= validation.MAX_LOAN_PAISE or upper < validation.MIN_LOAN_PAISE:
+            continue
+        # Scores fall as the amount grows, so later breakpoints only raise the maximum
+        status = eligibility_status(base_total + score)
+        max_amounts[status] = max(min(upper, validation.MAX_LOAN_PAISE), max_amounts.get(status, 0))
+    return max_amounts
 
 def log_application_action(application_id, action, details=None):
     """Log application actions"""
@@ -223,6 +329,107 @@ def log_application_action(application_id, action, details=None):
     db.session.add(log)
     db.session.commit()
 
+def encode_timeline_cursor(timestamp, log_id):
+    """Opaque cursor for the log entry a timeline page ended on"""
+    raw = f"{timestamp.isoformat()}|{log_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_timeline_cursor(cursor):
+    """Inverse of encode_timeline_cursor - raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, log_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except ValueError as e:  # covers bad base64, bad UTF-8 and bad fields
+        raise ValueError('Invalid cursor') from e
+
+def get_application_timeline(application, limit=20, cursor=None, actions=None, archive=False):
+    """One page of an application's log entries, newest first.
+    
+    Walks the (application_id, timestamp) index from the cursor position. With
+    archive=True it continues into the log archive once the live rows run out;
+    otherwise a page that may have archived history behind it still gets a
+    cursor, so only an explicit "older" request pays for reading segments.
+    Returns (entries, next_cursor); next_cursor is None on the last page.
+    """
+    query = ApplicationLog.query.filter(ApplicationLog.application_id == application.id)
+    if actions:
+        query = query.filter(ApplicationLog.action.in_(actions))
+    if cursor:
+        before_ts, before_id = decode_timeline_cursor(cursor)
+        query = query.filter(db.or_(
+            ApplicationLog.timestamp < before_ts,
+            db.and_(ApplicationLog.timestamp == before_ts, ApplicationLog.id < before_id)
+        ))
+    
+    rows = query.order_by(ApplicationLog.timestamp.desc(), ApplicationLog.id.desc()).limit(limit + 1).all()
+    entries = [
+        {'id': log.id, 'action': log.action, 'details': log.details, 'timestamp': log.timestamp}
+        for log in rows
+    ]
+    
+    # Live table exhausted - older history may have been archived, but only
+    # for applications old enough to have logs past the retention age
+    cutoff = datetime.utcnow() - timedelta(days=app.config['LOG_RETENTION_DAYS'])
+    if len(entries) <= limit and application.created_at and application.created_at < cutoff:
+        if entries:
+            before = (entries[-1]['timestamp'], entries[-1]['id'])
+        elif cursor:
+            before = (before_ts, before_id)
+        else:
+            before = None
+        if not archive:
+            # Leave the segments for an explicit request for older entries
+            return entries, encode_timeline_cursor(*(before or (datetime.utcnow(), 0)))
+        import log_retention
+        archived = log_retention.query_logs(
+            db.session,
+            app.config['LOG_ARCHIVE_DIR'],
+            start=application.created_at,
+            application_id=application.id,
+            action=actions or None,
+            before=before,
+            limit=limit + 1 - len(entries)
+        )
+        for record in reversed(archived):
+            entries.append({'id': record['id'], 'action': record['action'],
+                            'details': record['details'],
+                            'timestamp': datetime.fromisoformat(record['timestamp'])})
+    
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_timeline_cursor(entries[-1]['timestamp'], entries[-1]['id'])
+    return entries, next_cursor
+
+def find_application(app_id):
+    """Look up an application by its public ID, skipping IDs recently found missing"""
+    if app_id in missing_application_ids:
+        return None
+    application = LoanApplication.query.filter_by(application_id=app_id).first()
+    if application is None:
+        missing_application_ids.add(app_id)
+    return application
+
+# Admission Control
+@app.before_request
+def admission_control():
+    """Shed load with 429 before the route touches the database"""
+    limit = app.config['RATE_LIMITS'].get(request.endpoint)
+    if limit is None:
+        return None
+
+    rate, burst = limit
+    key = f"{request.remote_addr}:{request.endpoint}"
+    allowed, retry_after = limiter.allow(key, rate, burst)
+    if allowed:
+        return None
+
+    headers = {'Retry-After': str(max(1, int(retry_after + 0.999)))}
+    if request.path.startswith('/api/') or request.is_json:
+        return jsonify({'error': 'Too many requests'}), 429, headers
+    return render_template('errors/429.html'), 429, headers
+
 # Routes
 @app.route('/')
 def index():
@@ -241,65 +448,11 @@ def submit_application():
         form_data = request.form
         print(f"Form data received: {dict(form_data)}")
         
-        # Validate required fields
-        required_fields = [
-            'first_name', 'last_name', 'email', 'phone', 'date_of_birth',
-            'address', 'city', 'state', 'zip_code', 'employment_status',
-            'annual_income', 'loan_amount', 'loan_purpose'
-        ]
-        
-        for field in required_fields:
-            if not form_data.get(field):
-                flash(f'{field.replace("_", " ").title()} is required', 'error')
-                return redirect(url_for('apply'))
-        
-        # Validate email
-        if not validate_email(form_data['email']):
-            flash('Please enter a valid email address', 'error')
-            return redirect(url_for('apply'))
-        
-        # Validate phone
-        if not validate_phone(form_data['phone']):
-            flash('Please enter a valid 10-digit phone number', 'error')
-            return redirect(url_for('apply'))
-        
-        # Parse date of birth
-        try:
-            dob = datetime.strptime(form_data['date_of_birth'], '%Y-%m-%d').date()
-        except ValueError:
-            flash('Please enter a valid date of birth', 'error')
-            return redirect(url_for('apply'))
-        
-        # Validate age
-        age = calculate_age(dob)
-        if age < 18:
-            flash('You must be at least 18 years old to apply', 'error')
-            return redirect(url_for('apply'))
-        if age > 80:
-            flash('Maximum age limit is 80 years', 'error')
-            return redirect(url_for('apply'))
-        
-        # Validate loan amount
-        try:
-            loan_amount = Decimal(form_data['loan_amount'])
-            if loan_amount < 10000:
-                flash('Minimum loan amount is ₹10,000', 'error')
-                return redirect(url_for('apply'))
-            if loan_amount > 10000000:  # 1 Crore
-                flash('Maximum loan amount is ₹1,00,00,000', 'error')
-                return redirect(url_for('apply'))
-        except (ValueError, TypeError):
-            flash('Please enter a valid loan amount', 'error')
-            return redirect(url_for('apply'))
-        
-        # Validate annual income
-        try:
-            annual_income = Decimal(form_data['annual_income'])
-            if annual_income < 100000:  # 1 Lakh minimum
-                flash('Minimum annual income required is ₹1,00,000', 'error')
-                return redirect(url_for('apply'))
-        except (ValueError, TypeError):
-            flash('Please enter a valid annual income', 'error')
+        # Check every field at once so the user sees all problems together
+        cleaned, errors = validation.validate_application(form_data)
+        if errors:
+            for message in errors.values():
+                flash(message, 'error')
             return redirect(url_for('apply'))
         
         print("=== VALIDATION PASSED ===")
@@ -307,26 +460,26 @@ def submit_application():
         # Create application
         application = LoanApplication(
             application_id=generate_application_id(),
-            first_name=form_data['first_name'].strip(),
-            last_name=form_data['last_name'].strip(),
-            email=form_data['email'].strip().lower(),
-            phone=form_data['phone'].strip(),
-            date_of_birth=dob,
-            address=form_data['address'].strip(),
-            city=form_data['city'].strip(),
-            state=form_data['state'],
-            zip_code=form_data['zip_code'].strip(),
-            employment_status=form_data['employment_status'],
-            annual_income=annual_income,
-            loan_amount=loan_amount,
-            loan_purpose=form_data['loan_purpose']
+            first_name=cleaned['first_name'],
+            last_name=cleaned['last_name'],
+            email=cleaned['email'],
+            phone=cleaned['phone'],
+            date_of_birth=cleaned['date_of_birth'],
+            address=cleaned['address'],
+            city=cleaned['city'],
+            state=cleaned['state'],
+            zip_code=cleaned['zip_code'],
+            employment_status=cleaned['employment_status'],
+            annual_income_paise=cleaned['annual_income'],
+            loan_amount_paise=cleaned['loan_amount'],
+            loan_purpose=cleaned['loan_purpose']
         )
         
         print(f"=== SAVING APPLICATION TO DATABASE ===")
         print(f"Application ID: {application.application_id}")
         print(f"Name: {application.first_name} {application.last_name}")
         print(f"Email: {application.email}")
-        print(f"Loan Amount: ₹{application.loan_amount}")
+        print(f"Loan Amount: {money.format_paise(application.loan_amount_paise)}")
         
         db.session.add(application)
         db.session.flush()  # Get the ID without committing
@@ -350,6 +503,7 @@ def submit_application():
         
         db.session.add(eligibility)
         db.session.commit()
+        missing_application_ids.discard(application.application_id)
         
         print("=== DATABASE COMMIT SUCCESSFUL ===")
         
@@ -373,12 +527,13 @@ def submit_application():
 
 @app.route('/status/<app_id>')
 def application_status(app_id):
-    application = LoanApplication.query.filter_by(application_id=app_id).first()
+    application = find_application(app_id)
     if not application:
         flash('Application not found', 'error')
         return redirect(url_for('index'))
     
-    return render_template('status.html', application=application)
+    timeline, _ = get_application_timeline(application, limit=10)
+    return render_template('status.html', application=application, timeline=timeline)
 
 @app.route('/check-status', methods=['GET', 'POST'])
 def check_status():
@@ -390,14 +545,15 @@ def check_status():
             return render_template('check_status.html')
         
         # Find the application
-        application = LoanApplication.query.filter_by(application_id=application_id).first()
+        application = find_application(application_id)
         
         if not application:
             flash('Application not found. Please check your Application ID and try again.', 'error')
             return render_template('check_status.html')
         
         # Redirect to status page with the application
-        return render_template('status.html', application=application)
+        timeline, _ = get_application_timeline(application, limit=10)
+        return render_template('status.html', application=application, timeline=timeline)
     
     return render_template('check_status.html')
 
@@ -410,12 +566,10 @@ def search_application():
         flash('Please provide both Application ID and Email', 'error')
         return redirect(url_for('check_status'))
     
-    application = LoanApplication.query.filter_by(
-        application_id=app_id,
-        email=email
-    ).first()
+    # Look up by ID alone so unknown IDs land in the negative cache
+    application = find_application(app_id)
     
-    if not application:
+    if not application or application.email != email:
         flash('Application not found. Please check your Application ID and Email.', 'error')
         return redirect(url_for('check_status'))
     
@@ -447,21 +601,19 @@ def admin_dashboard():
     if not session.get('admin_logged_in'):
         return redirect(url_for('admin_login'))
     
-    # Get statistics
-    total_apps = LoanApplication.query.count()
-    pending_apps = LoanApplication.query.filter_by(status='pending').count()
-    approved_apps = LoanApplication.query.filter_by(status='approved').count()
-    rejected_apps = LoanApplication.query.filter_by(status='rejected').count()
+    application_listing.refresh(db.session)
     
+    # Get statistics
+    counts = application_listing.counts()
     stats = {
-        'total': total_apps,
-        'pending': pending_apps,
-        'approved': approved_apps,
-        'rejected': rejected_apps
+        'total': counts['total'],
+        'pending': counts.get('pending', 0),
+        'approved': counts.get('approved', 0),
+        'rejected': counts.get('rejected', 0)
     }
     
     # Get recent applications (last 10)
-    recent_applications = LoanApplication.query.order_by(LoanApplication.created_at.desc()).limit(10).all()
+    recent_applications = application_listing.applications(limit=10)
     
     return render_template('admin_dashboard.html', stats=stats, applications=recent_applications)
 
@@ -473,28 +625,34 @@ def admin_applications():
     # Get filter parameters
     status_filter = request.args.get('status', '')
     search_query = request.args.get('search', '')
+    min_percentage, max_percentage = ELIGIBILITY_BANDS.get(request.args.get('eligibility'), (None, None))
     
-    # Build query
-    query = LoanApplication.query
-    
-    if status_filter:
-        query = query.filter(LoanApplication.status == status_filter)
-    
-    if search_query:
-        search_pattern = f'%{search_query}%'
-        query = query.filter(
-            db.or_(
-                LoanApplication.first_name.ilike(search_pattern),
-                LoanApplication.last_name.ilike(search_pattern),
-                LoanApplication.email.ilike(search_pattern),
-                LoanApplication.application_id.ilike(search_pattern)
-            )
+    previous_url = next_url = None
+    if request.args.get('sort') in ('eligibility', 'eligibility_asc'):
+        # Ordered by score on the eligibility index, one page at a time
+        page_size = app.config['ADMIN_PAGE_SIZE']
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        applications = listing.by_eligibility(
+            db.session, status=status_filter, min_percentage=min_percentage, max_percentage=max_percentage,
+            ascending=request.args.get('sort') == 'eligibility_asc', search=search_query,
+            limit=page_size + 1, offset=offset
+        )
+        args = request.args.to_dict()
+        if len(applications) > page_size:
+            applications = applications[:page_size]
+            next_url = url_for('admin_applications', **dict(args, offset=offset + page_size))
+        if offset:
+            previous_url = url_for('admin_applications', **dict(args, offset=max(offset - page_size, 0)))
+    else:
+        # Filter the in-memory listing (newest first) by status, band and name/email/ID
+        application_listing.refresh(db.session)
+        applications = application_listing.applications(
+            status=status_filter, search=search_query,
+            min_percentage=min_percentage, max_percentage=max_percentage
         )
     
-    # Get applications ordered by creation date (newest first)
-    applications = query.order_by(LoanApplication.created_at.desc()).all()
-    
-    return render_template('admin_applications.html', applications=applications)
+    return render_template('admin_applications.html', applications=applications,
+                           previous_url=previous_url, next_url=next_url)
 
 @app.route('/admin/application/<app_id>', methods=['GET', 'POST'])
 def admin_application_detail(app_id):
@@ -544,7 +702,9 @@ def admin_application_detail(app_id):
         
         return redirect(url_for('admin_application_detail', app_id=app_id))
     
-    return render_template('admin_application_detail.html', application=application)
+    timeline, timeline_cursor = get_application_timeline(application, limit=20)
+    return render_template('admin_application_detail.html', application=application,
+                           timeline=timeline, timeline_cursor=timeline_cursor)
 
 @app.route('/admin/update-status/<app_id>', methods=['POST'])
 def admin_update_status(app_id):
@@ -592,7 +752,8 @@ def admin_logout():
 @app.route('/view-all-applications')
 def view_all_applications():
     """Simple route to view all applications in database"""
-    applications = LoanApplication.query.order_by(LoanApplication.created_at.desc()).all()
+    application_listing.refresh(db.session)
+    applications = application_listing.applications()
     
     html = """
     <!DOCTYPE html>
@@ -628,15 +789,15 @@ def view_all_applications():
     """
     
     for app in applications:
-        eligibility_pct = app.eligibility.percentage if app.eligibility else 0
+        eligibility_pct = app.eligibility_percentage or 0
         html += f"""
             <tr>
                 <td>{app.application_id}</td>
                 <td>{app.first_name} {app.last_name}</td>
                 <td>{app.email}</td>
                 <td>{app.phone}</td>
-                <td>₹{app.loan_amount:,.2f}</td>
-                <td>₹{app.annual_income:,.2f}</td>
+                <td>{money.format_paise(app.loan_amount_paise)}</td>
+                <td>{money.format_paise(app.annual_income_paise)}</td>
                 <td class="status-{app.status}">{app.status.replace('_', ' ').title()}</td>
                 <td>{eligibility_pct:.1f}%</td>
                 <td>{app.created_at.strftime('%d %b %Y %I:%M %p')}</td>
@@ -657,7 +818,7 @@ def view_all_applications():
 # API Routes
 @app.route('/api/application/<app_id>')
 def api_get_application(app_id):
-    application = LoanApplication.query.filter_by(application_id=app_id).first()
+    application = find_application(app_id)
     if not application:
         return jsonify({'error': 'Application not found'}), 404
     
@@ -665,7 +826,7 @@ def api_get_application(app_id):
         'application_id': application.application_id,
         'status': application.status,
         'applicant_name': f"{application.first_name} {application.last_name}",
-        'loan_amount': float(application.loan_amount),
+        'loan_amount': money.rupees(application.loan_amount_paise),
         'created_at': application.created_at.isoformat(),
         'eligibility': {
             'percentage': float(application.eligibility.percentage) if application.eligibility else 0,
@@ -673,6 +834,41 @@ def api_get_application(app_id):
         }
     })
 
+@app.route('/api/application/<app_id>/timeline')
+def api_get_application_timeline(app_id):
+    application = find_application(app_id)
+    if not application:
+        return jsonify({'error': 'Application not found'}), 404
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    
+    # ?action=a&action=b or ?action=a,b
+    actions = [a for value in request.args.getlist('action') for a in value.split(',') if a]
+    
+    try:
+        # The archive is only read when the client asks for older entries
+        cursor = request.args.get('cursor') or None
+        entries, next_cursor = get_application_timeline(
+            application, limit=limit, cursor=cursor, actions=actions, archive=cursor is not None
+        )
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    # Log details can contain reviewer comments - only admins see them
+    is_admin = bool(session.get('admin_logged_in'))
+    return jsonify({
+        'application_id': application.application_id,
+        'entries': [{
+            'action': entry['action'],
+            'details': entry['details'] if is_admin else None,
+            'timestamp': entry['timestamp'].isoformat()
+        } for entry in entries],
+        'next_cursor': next_cursor
+    })
+
 @app.route('/api/stats')
 def api_get_stats():
     if not session.get('admin_logged_in'):
@@ -695,6 +891,188 @@ def api_get_stats():
         'status_distribution': [{'status': stat.status, 'count': stat.count} for stat in status_stats]
     })
 
+@app.route('/api/applications')
+def api_list_applications():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    band = request.args.get('eligibility')
+    if band and band not in ELIGIBILITY_BANDS:
+        return jsonify({'error': f"eligibility must be one of {', '.join(ELIGIBILITY_BANDS)}"}), 400
+    sort = request.args.get('sort', 'eligibility')
+    if sort not in ('eligibility', 'eligibility_asc', 'newest'):
+        return jsonify({'error': 'sort must be eligibility, eligibility_asc or newest'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    min_score = request.args.get('min_score')
+    if min_score is not None:
+        try:
+            min_score = float(min_score)
+        except ValueError:
+            min_score = None
+        # Eligibility percentages run 0-100; NaN fails this comparison too
+        if min_score is None or not 0 <= min_score <= 100:
+            return jsonify({'error': 'min_score must be a number from 0 to 100'}), 400
+    
+    status_filter = request.args.get('status') or None
+    min_percentage, max_percentage = ELIGIBILITY_BANDS.get(band, (None, None))
+    if min_score is not None:
+        min_percentage = max(min_score, min_percentage or 0)
+    
+    if sort == 'newest':
+        application_listing.refresh(db.session)
+        rows = application_listing.applications(
+            status=status_filter, min_percentage=min_percentage, max_percentage=max_percentage
+        )[offset:offset + limit]
+    else:
+        rows = listing.by_eligibility(
+            db.session, status=status_filter, min_percentage=min_percentage, max_percentage=max_percentage,
+            ascending=sort == 'eligibility_asc', limit=limit, offset=offset
+        )
+    
+    return jsonify({
+        'applications': [{
+            'application_id': row.application_id,
+            'name': f"{row.first_name} {row.last_name}",
+            'email': row.email,
+            'status': row.status,
+            'loan_amount': money.rupees(row.loan_amount_paise),
+            'annual_income': money.rupees(row.annual_income_paise),
+            'eligibility_percentage': row.eligibility_percentage,
+            'eligibility_status': eligibility_status(row.eligibility_percentage)
+                                  if row.eligibility_percentage is not None else None,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+        } for row in rows],
+        'limit': limit,
+        'offset': offset,
+    })
+
+@app.route('/api/validate-application', methods=['POST'])
+def api_validate_application():
+    """Run the submit-time validation rules without saving anything"""
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+    else:
+        data = request.form
+    
+    # Optional list of fields to check, e.g. just the one the user left
+    fields = data.get('fields') if request.is_json else request.form.getlist('fields')
+    if fields is not None and not isinstance(fields, list):
+        return jsonify({'error': 'fields must be a list of field names'}), 400
+    
+    _cleaned, errors = validation.validate_application(data, fields=fields or None)
+    return jsonify({'valid': not errors, 'errors': errors})
+
+@app.route('/api/eligibility/preview', methods=['POST'])
+def api_eligibility_preview():
+    """Score candidate loan amounts without creating an application"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    
+    # The same rules as the apply form: age limits, minimum income, text values
+    cleaned, errors = validation.validate_application(
+        data, fields=('date_of_birth', 'employment_status', 'annual_income')
+    )
+    if errors:
+        return jsonify({'error': 'Invalid application details', 'errors': errors}), 400
+    dob, annual_income = cleaned['date_of_birth'], cleaned['annual_income']
+    
+    try:
+        loan_amounts = data.get('loan_amounts') or []
+        if not isinstance(loan_amounts, list):
+            raise ValueError(loan_amounts)
+        loan_amounts = [money.parse_rupees(amount) for amount in loan_amounts]
+    except ValueError:
+        return jsonify({'error': 'loan_amounts must be a list of rupee amounts'}), 400
+    
+    if len(loan_amounts) > 50:
+        return jsonify({'error': 'At most 50 loan amounts per request'}), 400
+    
+    base_scores = base_eligibility_scores(dob, annual_income, cleaned['employment_status'])
+    results = []
+    for loan_amount in loan_amounts:
+        result = score_eligibility(base_scores, loan_amount, annual_income)
+        result['loan_amount'] = money.rupees(loan_amount)
+        result['within_limits'] = validation.MIN_LOAN_PAISE <= loan_amount <= validation.MAX_LOAN_PAISE
+        results.append(result)
+    
+    max_amounts = max_loan_by_status(base_scores, annual_income)
+    return jsonify({
+        'results': results,
+        'max_loan_amount': {
+            status: money.rupees(max_amounts[status])
+            for status in ELIGIBILITY_STATUSES if status in max_amounts
+        }
+    })
+
+@app.route('/api/analytics')
+def api_get_analytics():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Histograms, percentiles and approval rates by state, employment and purpose
+    import analytics
+    return jsonify(analytics.get_analytics(db.session))
+
+@app.route('/api/logs')
+def api_get_logs():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Time-range query across the live table and the archive, newest first
+    if not request.args.get('start') or not request.args.get('end'):
+        return jsonify({'error': 'start and end are required, e.g. start=2024-01-01&end=2024-02-01'}), 400
+    try:
+        start = datetime.fromisoformat(request.args['start'])
+        end = datetime.fromisoformat(request.args['end'])
+    except ValueError:
+        return jsonify({'error': 'start and end must be ISO dates, e.g. 2024-01-31'}), 400
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    
+    before = None
+    if request.args.get('cursor'):
+        try:
+            before = decode_timeline_cursor(request.args['cursor'])
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    application_pk = None
+    app_id = request.args.get('application_id')
+    if app_id:
+        application = LoanApplication.query.filter_by(application_id=app_id).first()
+        if not application:
+            return jsonify({'error': 'Application not found'}), 404
+        application_pk = application.id
+    
+    import log_retention
+    logs = log_retention.query_logs(
+        db.session,
+        app.config['LOG_ARCHIVE_DIR'],
+        start=start,
+        end=end,
+        application_id=application_pk,
+        action=request.args.get('action') or None,
+        before=before,
+        limit=limit + 1
+    )
+    logs.reverse()
+    
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = encode_timeline_cursor(datetime.fromisoformat(logs[-1]['timestamp']), logs[-1]['id'])
+    return jsonify({'logs': logs, 'count': len(logs), 'next_cursor': next_cursor})
+
 # Error Handlers
 @app.errorhandler(404)
 def not_found_error(error):
@@ -721,11 +1099,19 @@ def inject_current_year():
 # Initialize Database
 def init_db():
     """Initialize database with tables"""
+    import migrations
     with app.app_context():
+        db_path = db.engine.url.database
+        # Schema already at the latest version - skip create_all's per-table checks
+        if migrations.schema_is_current(db_path):
+            return
+        
         # Create database file if it doesn't exist
         db.create_all()
+        # create_all skips existing tables - migrations bring them up to date
+        migrations.migrate(db_path)
         print("✅ Database tables created successfully!")
-        print(f"📁 Database file: {os.path.abspath('loanpro.db')}")
+        print(f"📁 Database file: {os.path.abspath(db_path)}")
         
         # Check if database is working
         try:
@@ -734,6 +1120,19 @@ def init_db():
         except Exception as e:
             print(f"❌ Database error: {e}")
 
+def start_backup_scheduler():
+    """Start the background backup task if BACKUP_INTERVAL_SECONDS is set"""
+    interval = app.config['BACKUP_INTERVAL_SECONDS']
+    if not interval:
+        return None
+    import backup
+    with app.app_context():
+        db_path = db.engine.url.database
+    scheduler = backup.BackupScheduler(db_path, app.config['BACKUP_DIR'], interval)
+    scheduler.start()
+    print(f"💾 Online backups every {interval}s to {app.config['BACKUP_DIR']}")
+    return scheduler
+
 if __name__ == '__main__':
     print("🚀 Starting LoanPro Application...")
     print("📍 Running in LOCAL MODE - No network required")
@@ -741,6 +1140,7 @@ if __name__ == '__main__':
     
     # Initialize database
     init_db()
+    start_backup_scheduler()
     
     print("\n🌐 Application URLs:")
     print("   Main App: http://localhost:5000")
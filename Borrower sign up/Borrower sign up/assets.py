@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+LoanPro static asset pipeline
+Bundles, minifies and fingerprints the CSS/JS under static/ into static/dist,
+with gzip and brotli variants, and serves them with immutable cache headers.
+
+Run `python assets.py` after changing anything under static/.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - gzip variants are always written
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_FILE = os.path.join(DIST_DIR, 'manifest.json')
+
+# Logical asset name -> source files (relative to static/) concatenated in order
+BUNDLES = {
+    'css/style.css': ['css/style.css'],
+    'css/admin.css': ['css/admin.css'],
+    'js/script.js': ['js/script.js'],
+}
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Characters after which a '/' starts a regex literal rather than a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'throw', 'delete', 'new')
+# Any run of whitespace containing a line break
+_LINE_BREAK = re.compile(r'\s*\n\s*')
+
+
+def minify_js(source):
+    """Strip comments and indentation from JavaScript.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly as
+    in the original file; strings, template literals and regexes are copied
+    through untouched.
+    """
+    out = []
+    literals = set()  # indexes in out of strings, template literals and regexes
+    i, n = 0, len(source)
+    last_significant = ''
+
+    while i < n:
+        ch = source[i]
+        nxt = source[i + 1] if i + 1 < n else ''
+
+        if ch in '\'"`':
+            end = i + 1
+            while end < n and source[end] != ch:
+                end += 2 if source[end] == '\\' else 1
+            literals.add(len(out))
+            out.append(source[i:end + 1])
+            last_significant = ch
+            i = end + 1
+        elif ch == '/' and nxt == '/':
+            while i < n and source[i] != '\n':
+                i += 1
+        elif ch == '/' and nxt == '*':
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif ch == '/' and _starts_regex(out, last_significant):
+            end, in_class = i + 1, False
+            while end < n and source[end] != '\n':
+                c = source[end]
+                if c == '\\':
+                    end += 2
+                    continue
+                if c == '[':
+                    in_class = True
+                elif c == ']':
+                    in_class = False
+                elif c == '/' and not in_class:
+                    break
+                end += 1
+            literals.add(len(out))
+            out.append(source[i:end + 1])
+            last_significant = '/'
+            i = end + 1
+        else:
+            out.append(ch)
+            if not ch.isspace():
+                last_significant = ch
+            i += 1
+
+    # Drop indentation, trailing spaces and blank lines in the code between
+    # literals only - a multi-line template literal keeps its own whitespace
+    pieces, code = [], []
+    for index, piece in enumerate(out):
+        if index in literals:
+            pieces.append(_LINE_BREAK.sub('\n', ''.join(code)))
+            pieces.append(piece)
+            code = []
+        else:
+            code.append(piece)
+    pieces.append(_LINE_BREAK.sub('\n', ''.join(code)))
+    return ''.join(pieces).strip() + '\n'
+
+
+def _starts_regex(out, last_significant):
+    if not last_significant or last_significant in _REGEX_PRECEDERS:
+        return True
+    tail = ''.join(out[-12:]).rstrip()
+    return any(tail.endswith(keyword) and not tail[:-len(keyword)][-1:].isalnum()
+               for keyword in _REGEX_KEYWORDS)
+
+
+def minify_css(source):
+    """Strip comments and collapse whitespace in a stylesheet"""
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', source)
+    for index in range(0, len(parts), 2):
+        text = re.sub(r'/\*.*?\*/', '', parts[index], flags=re.S)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+        text = text.replace(';}', '}')
+        parts[index] = text
+    return ''.join(parts).strip() + '\n'
+
+
+def fingerprint(name, content):
+    """Insert a content hash before the extension: css/style.css -> css/style.<hash>.css"""
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def build(verbose=True):
+    """Build every bundle into static/dist and write the manifest"""
+    manifest = {}
+
+    for name, sources in BUNDLES.items():
+        texts = []
+        for source in sources:
+            with open(os.path.join(STATIC_DIR, source), encoding='utf-8') as f:
+                texts.append(f.read())
+        combined = '\n'.join(texts)
+        minified = minify_css(combined) if name.endswith('.css') else minify_js(combined)
+        content = minified.encode('utf-8')
+
+        hashed = fingerprint(name, content)
+        target = os.path.join(DIST_DIR, hashed)
+        _write(target, content)
+        _write(target + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(target + '.br', brotli.compress(content, quality=11))
+
+        manifest[name] = hashed
+        if verbose:
+            original = sum(len(t.encode('utf-8')) for t in texts)
+            print(f"   {name:<16} {original:>8,} B -> {len(content):>8,} B  ({hashed})")
+
+    _write(MANIFEST_FILE, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    _remove_stale(manifest)
+    return manifest
+
+
+def _remove_stale(manifest):
+    """Delete fingerprinted files from earlier builds"""
+    current = set()
+    for hashed in manifest.values():
+        current.update({hashed, hashed + '.gz', hashed + '.br'})
+
+    for root, _dirs, files in os.walk(DIST_DIR):
+        for filename in files:
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, DIST_DIR).replace(os.sep, '/')
+            if relative != 'manifest.json' and relative not in current:
+                os.remove(path)
+
+
+def load_manifest():
+    """Return the logical -> fingerprinted name map, or {} if assets are not built"""
+    try:
+        with open(MANIFEST_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_app(app):
+    """Register the asset_url template helper and the /assets route"""
+    from flask import abort, request, send_file, url_for
+    from werkzeug.security import safe_join
+
+    manifest = load_manifest()
+    app.extensions['asset_manifest'] = manifest
+
+    @app.template_global()
+    def asset_url(filename):
+        """URL for a static asset, using the fingerprinted build when available"""
+        hashed = manifest.get(filename)
+        if hashed is None:
+            return url_for('static', filename=filename)
+        return url_for('serve_asset', filename=hashed)
+
+    @app.route('/assets/<path:filename>')
+    def serve_asset(filename):
+        path = safe_join(DIST_DIR, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        encoding = None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[candidate] and os.path.isfile(path + suffix):
+                encoding, path = candidate, path + suffix
+                break
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_file(path, mimetype=mimetype, conditional=True, max_age=31536000)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    return asset_url
+
+
+if __name__ == '__main__':
+    print("📦 Building static assets...")
+    if brotli is None:
+        print("   (brotli not installed - writing gzip variants only)")
+    result = build()
+    print(f"✅ {len(result)} bundles written to {DIST_DIR}")
+    sys.exit(0)
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Online backups for LoanPro
+Copies the live database with SQLite's online backup API a few pages at a
+time, so the app keeps serving while a backup runs. Any write from another
+connection restarts that copy, so under steady writes it falls back to
+copying everything in one step (see online_backup).
+
+Backups are kept as chains: a full snapshot followed by incremental
+snapshots that store only the pages that changed since the previous one.
+An incremental snapshot still makes a full online copy into a temp file
+and diffs its pages, so it saves disk space, not read I/O.
+Every snapshot records the SHA-256 of the database it represents, and a
+restore is only reported as good once the rebuilt file matches it and
+passes PRAGMA integrity_check.
+
+Usage:
+    python backup.py                  # incremental snapshot (full if no chain exists)
+    python backup.py --full           # start a new chain with a full snapshot
+    python backup.py --list           # show chains and snapshots
+    python backup.py --verify         # restore the latest snapshot to a temp file and check it
+    python backup.py --restore PATH   # rebuild the latest snapshot into PATH
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows - the scheduler runs without a cross-process lock
+    fcntl = None
+
+PAGES_PER_STEP = 256
+STEP_SLEEP = 0.01
+# Restarts (caused by writes to the source) before finishing the copy in one step
+MAX_RESTARTS = 3
+# SQLITE_BUSY, SQLITE_LOCKED - the backup sleeps only after a step returns one of these
+_RETRY_STATUSES = (5, 6)
+KEEP_CHAINS = 3
+
+
+def online_backup(src_path, dest_path, pages_per_step=PAGES_PER_STEP, sleep=STEP_SLEEP,
+                  max_restarts=MAX_RESTARTS):
+    """Copy src_path to dest_path in small steps and report throughput.
+
+    A write to the source from another connection makes SQLite restart the
+    copy from page 1. After max_restarts restarts the copy is finished in
+    one step, which keeps the source's read lock for the whole copy (in WAL
+    mode writers still carry on). With a writer committing every millisecond
+    every backup ends up there, so under steady writes there are no small
+    steps; `single_step` and `restarts` in the result say when it happened.
+
+    max_step_ms is the longest step as timed from the progress callback. It
+    is not a measurement of how long any writer waited.
+    """
+    src = sqlite3.connect(src_path)
+    dest = sqlite3.connect(dest_path)
+    step_times = []
+    last = [time.perf_counter()]
+    slept = [False]
+    previous_remaining = [None]
+    restarts = [0]
+
+    def progress(status, remaining, total):
+        now = time.perf_counter()
+        step_times.append(now - last[0] - (sleep if slept[0] else 0))
+        last[0] = now
+        slept[0] = status in _RETRY_STATUSES
+        if slept[0]:
+            return
+        # Each step copies pages, so remaining only stops falling on a restart
+        if previous_remaining[0] is not None and remaining >= previous_remaining[0]:
+            restarts[0] += 1
+            if restarts[0] > max_restarts:
+                raise _TooManyRestarts()
+        previous_remaining[0] = remaining
+
+    started = time.perf_counter()
+    single_step = False
+    try:
+        try:
+            src.backup(dest, pages=pages_per_step, progress=progress, sleep=sleep)
+        except _TooManyRestarts:
+            single_step = True
+            step_started = time.perf_counter()
+            src.backup(dest)
+            step_times.append(time.perf_counter() - step_started)
+        page_size = dest.execute("PRAGMA page_size").fetchone()[0]
+        page_count = dest.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dest.close()
+        src.close()
+    elapsed = time.perf_counter() - started
+
+    size = page_size * page_count
+    return {
+        'pages': page_count,
+        'page_size': page_size,
+        'bytes': size,
+        'steps': len(step_times),
+        'restarts': restarts[0],
+        'single_step': single_step,
+        'seconds': round(elapsed, 4),
+        'throughput_mb_s': round(size / elapsed / 1e6, 2) if elapsed else None,
+        'max_step_ms': round(max(max(step_times, default=0), 0) * 1000, 2),
+    }
+
+
+class _TooManyRestarts(Exception):
+    """Raised from the progress callback to abandon a stepped backup"""
+
+
+def _read_pages(path, page_size):
+    with open(path, 'rb') as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                break
+            yield page
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chain_files(backup_dir):
+    return sorted(glob.glob(os.path.join(backup_dir, 'chain-*.json')))
+
+
+def _load_chain(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_chain(path, chain):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(chain, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def take_snapshot(db_path, backup_dir, full=False, pages_per_step=PAGES_PER_STEP, sleep=STEP_SLEEP):
+    """Back up db_path into backup_dir as a full or incremental snapshot"""
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    chains = _chain_files(backup_dir)
+
+    fd, tmp_path = tempfile.mkstemp(suffix='.db', dir=backup_dir)
+    os.close(fd)
+    try:
+        stats = online_backup(db_path, tmp_path, pages_per_step, sleep)
+        page_size = stats['page_size']
+        sha256 = _sha256_file(tmp_path)
+
+        chain = _load_chain(chains[-1]) if chains and not full else None
+        if chain is not None and chain['page_size'] != page_size:
+            chain = None  # page size changed (VACUUM) - deltas no longer line up
+
+        if chain is None:
+            chain_path = os.path.join(backup_dir, f"chain-{stamp}.json")
+            base_name = f"full-{stamp}.db"
+            shutil.move(tmp_path, os.path.join(backup_dir, base_name))
+            hashes = [hashlib.sha1(page).digest() for page in _read_pages(os.path.join(backup_dir, base_name), page_size)]
+            chain = {'page_size': page_size, 'snapshots': []}
+            entry = {'file': base_name, 'kind': 'full', 'changed_pages': stats['pages']}
+        else:
+            chain_path = chains[-1]
+            hashes_path = chain_path[:-len('.json')] + '.hashes'
+            with open(hashes_path, 'rb') as f:
+                raw = f.read()
+            previous = [raw[i:i + 20] for i in range(0, len(raw), 20)]
+
+            delta_name = f"incr-{stamp}.delta.gz"
+            hashes, changed = [], 0
+            with gzip.open(os.path.join(backup_dir, delta_name), 'wb') as out:
+                out.write(json.dumps({'page_size': page_size, 'page_count': stats['pages']}).encode() + b'\n')
+                for number, page in enumerate(_read_pages(tmp_path, page_size), start=1):
+                    digest = hashlib.sha1(page).digest()
+                    hashes.append(digest)
+                    if number > len(previous) or previous[number - 1] != digest:
+                        out.write(struct.pack('>I', number) + page)
+                        changed += 1
+            os.remove(tmp_path)
+            entry = {'file': delta_name, 'kind': 'incremental', 'changed_pages': changed}
+
+        with open(chain_path[:-len('.json')] + '.hashes', 'wb') as f:
+            f.write(b''.join(hashes))
+
+        entry.update({
+            'created': stamp,
+            'page_count': stats['pages'],
+            'sha256': sha256,
+        })
+        chain['snapshots'].append(entry)
+        _save_chain(chain_path, chain)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    _prune_chains(backup_dir)
+    stats.update({'file': entry['file'], 'kind': entry['kind'], 'changed_pages': entry['changed_pages']})
+    return stats
+
+
+def _prune_chains(backup_dir, keep=KEEP_CHAINS):
+    """Delete whole chains beyond the newest `keep`"""
+    for chain_path in _chain_files(backup_dir)[:-keep]:
+        chain = _load_chain(chain_path)
+        for snapshot in chain['snapshots']:
+            path = os.path.join(backup_dir, snapshot['file'])
+            if os.path.exists(path):
+                os.remove(path)
+        for path in (chain_path, chain_path[:-len('.json')] + '.hashes'):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def restore(backup_dir, dest_path, chain_path=None, upto=None):
+    """Rebuild a snapshot into dest_path and verify it.
+
+    Defaults to the newest snapshot of the newest chain; `upto` selects an
+    earlier snapshot by its 'created' stamp. Raises ValueError if the
+    result does not match the recorded checksum or fails integrity_check.
+    """
+    chains = _chain_files(backup_dir)
+    if chain_path is None:
+        if not chains:
+            raise ValueError(f"No backups found in {backup_dir}")
+        chain_path = chains[-1]
+    chain = _load_chain(chain_path)
+    page_size = chain['page_size']
+
+    snapshots = chain['snapshots']
+    if upto is not None:
+        stamps = [s['created'] for s in snapshots]
+        if upto not in stamps:
+            raise ValueError(f"No snapshot {upto} in {os.path.basename(chain_path)}")
+        snapshots = snapshots[:stamps.index(upto) + 1]
+
+    shutil.copyfile(os.path.join(backup_dir, snapshots[0]['file']), dest_path)
+    with open(dest_path, 'r+b') as out:
+        for snapshot in snapshots[1:]:
+            with gzip.open(os.path.join(backup_dir, snapshot['file']), 'rb') as delta:
+                delta.readline()  # header
+                while True:
+                    number = delta.read(4)
+                    if not number:
+                        break
+                    out.seek((struct.unpack('>I', number)[0] - 1) * page_size)
+                    out.write(delta.read(page_size))
+        out.truncate(snapshots[-1]['page_count'] * page_size)
+
+    target = snapshots[-1]
+    if _sha256_file(dest_path) != target['sha256']:
+        raise ValueError(f"Restored database does not match snapshot {target['created']}")
+
+    conn = sqlite3.connect(dest_path)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != 'ok':
+        raise ValueError(f"Integrity check failed for snapshot {target['created']}: {result}")
+    return target
+
+
+def verify(backup_dir):
+    """Restore the newest snapshot to a temporary file and check it"""
+    fd, tmp_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        return restore(backup_dir, tmp_path)
+    finally:
+        os.remove(tmp_path)
+
+
+class BackupScheduler(threading.Thread):
+    """Background thread taking an incremental snapshot every `interval` seconds.
+
+    A full snapshot starts a new chain every `full_every` runs. When several
+    workers start a scheduler, a lock file makes sure only one of them runs.
+    last_stats holds the newest snapshot's stats, including whether it had
+    to fall back to a single-step copy.
+    """
+
+    def __init__(self, db_path, backup_dir, interval, full_every=24):
+        super().__init__(name='loanpro-backup', daemon=True)
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval = interval
+        self.full_every = full_every
+        self.last_stats = None
+        self._stop_event = threading.Event()
+        self._lock_file = None
+
+    def _acquire_lock(self):
+        if fcntl is None:
+            return True
+        os.makedirs(self.backup_dir, exist_ok=True)
+        self._lock_file = open(os.path.join(self.backup_dir, '.scheduler.lock'), 'w')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+
+    def run(self):
+        if not self._acquire_lock():
+            return
+        runs = 0
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.last_stats = take_snapshot(self.db_path, self.backup_dir, full=(runs % self.full_every == 0))
+                runs += 1
+                if self.last_stats['single_step']:
+                    print(f"⚠️  Scheduled backup {self.last_stats['file']} was restarted "
+                          f"{self.last_stats['restarts']} times by concurrent writes; "
+                          f"finished in one step (longest step {self.last_stats['max_step_ms']} ms)")
+            except Exception as e:
+                print(f"❌ Scheduled backup failed: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def main(argv=None):
+    import argparse
+    from app import app, db
+
+    parser = argparse.ArgumentParser(description='Online backups of the LoanPro database')
+    parser.add_argument('--full', action='store_true', help='start a new chain with a full snapshot')
+    parser.add_argument('--list', action='store_true', help='list chains and snapshots')
+    parser.add_argument('--verify', action='store_true', help='restore the newest snapshot to a temp file and check it')
+    parser.add_argument('--restore', metavar='PATH', help='rebuild the newest snapshot into PATH')
+    args = parser.parse_args(argv)
+
+    backup_dir = app.config['BACKUP_DIR']
+    with app.app_context():
+        db_path = db.engine.url.database
+
+    if args.list:
+        for chain_path in _chain_files(backup_dir):
+            print(f"🔗 {os.path.basename(chain_path)}")
+            for snapshot in _load_chain(chain_path)['snapshots']:
+                print(f"   {snapshot['created']}  {snapshot['kind']:<11} {snapshot['changed_pages']:>8} pages  {snapshot['file']}")
+        return 0
+
+    if args.verify or args.restore:
+        try:
+            if args.restore:
+                snapshot = restore(backup_dir, args.restore)
+                print(f"✅ Restored snapshot {snapshot['created']} to {args.restore}")
+            else:
+                snapshot = verify(backup_dir)
+                print(f"✅ Snapshot {snapshot['created']} restores cleanly (sha256 {snapshot['sha256'][:12]}…)")
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        return 0
+
+    print(f"💾 Backing up {db_path}")
+    stats = take_snapshot(db_path, backup_dir, full=args.full)
+    print(f"✅ {stats['kind'].title()} snapshot {stats['file']}")
+    print(f"   {stats['pages']} pages ({stats['bytes']:,} bytes), {stats['changed_pages']} stored")
+    print(f"   {stats['seconds']}s in {stats['steps']} steps, {stats['throughput_mb_s']} MB/s")
+    print(f"   Longest step: {stats['max_step_ms']} ms")
+    if stats['single_step']:
+        print(f"   ⚠️  Restarted {stats['restarts']} times by concurrent writes; finished in one step")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
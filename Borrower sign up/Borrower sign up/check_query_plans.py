@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Query plan check for LoanPro
+Drives every database-backed route in app.py against a scratch database,
+captures the SQL each one runs, and EXPLAINs it. Exits non-zero if any
+query reads a whole table or index instead of seeking with an index,
+unless the route lists a reason that scan is acceptable.
+
+Usage:
+    python check_query_plans.py
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+# by_eligibility walks the percentage index best first and stops at the LIMIT;
+# a status filter matching few rows can still read the whole index
+_ELIGIBILITY_ORDER = 'walks the percentage index in order up to the LIMIT'
+# Reasons that only hold for a statement with a LIMIT - without one the scan fails the check
+_NEEDS_LIMIT = {_ELIGIBILITY_ORDER}
+
+# Routes to exercise: (label, method, url template, form data, reason a full scan is acceptable)
+ROUTES = [
+    ('submit application', 'POST', '/submit-application', 'APPLICATION_FORM', None),
+    ('status page', 'GET', '/status/{app_id}', None, None),
+    ('check status', 'POST', '/check-status', {'application_id': '{app_id}'}, None),
+    ('search application', 'POST', '/search-application', {'application_id': '{app_id}', 'email': 'plan.check@example.com'}, None),
+    ('api application', 'GET', '/api/application/{app_id}', None, None),
+    ('api timeline', 'GET', '/api/application/{app_id}/timeline?action=status_updated', None, None),
+    ('admin dashboard', 'GET', '/admin/dashboard', None, None),
+    ('admin applications', 'GET', '/admin/applications', None, None),
+    ('admin applications by status', 'GET', '/admin/applications?status=pending', None, None),
+    ('admin applications search', 'GET', '/admin/applications?search=plan', None, None),
+    ('admin applications by eligibility', 'GET', '/admin/applications?status=pending&sort=eligibility', None, _ELIGIBILITY_ORDER),
+    ('admin applications by band', 'GET', '/admin/applications?eligibility=eligible&sort=eligibility_asc', None, None),
+    ('admin detail', 'GET', '/admin/application/{app_id}', None, None),
+    ('view all applications', 'GET', '/view-all-applications', None, None),
+    ('api applications', 'GET', '/api/applications?status=pending&limit=50', None, _ELIGIBILITY_ORDER),
+    ('api applications by band', 'GET', '/api/applications?eligibility=highly_eligible&offset=50', None, None),
+    ('api stats', 'GET', '/api/stats', None, 'month and status counts cover every application'),
+    ('api analytics', 'GET', '/api/analytics', None, 'distributions aggregate every application'),
+    ('api logs', 'GET', '/api/logs?start=2000-01-01&end=2100-01-01', None, None),
+]
+
+APPLICATION_FORM = {
+    'first_name': 'Plan', 'last_name': 'Check', 'email': 'plan.check@example.com',
+    'phone': '9876543210', 'date_of_birth': '1990-01-01', 'address': '1 Index Street, Query Nagar',
+    'city': 'Pune', 'state': 'maharashtra', 'zip_code': '411001', 'employment_status': 'employed',
+    'annual_income': '800000', 'loan_amount': '1500000', 'loan_purpose': 'education',
+}
+
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.I)
+# SEARCH lines use an index to seek; every SCAN line walks a whole table or a
+# whole index (USING INDEX / USING COVERING INDEX is still a full scan).
+# SQLite before 3.36 prints "SCAN TABLE name [AS alias]", later builds "SCAN alias"
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(?: USING (?:COVERING )?INDEX \w+)?$')
+_LIMIT = re.compile(r'\bLIMIT\b', re.I)
+
+
+def full_scans(conn, statement, params, tables):
+    """Tables the statement reads with a full scan, according to EXPLAIN QUERY PLAN"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(statement):
+        if table in tables:
+            aliases[table] = table
+            if alias:
+                aliases[alias] = table
+
+    scans = []
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", params):
+        match = _FULL_SCAN.match(row[-1])
+        name = match and (match.group(2) or match.group(1))
+        if name in aliases:
+            scans.append(aliases[name])
+    return scans
+
+
+def main():
+    scratch = tempfile.mkdtemp(prefix='loanpro-plans-')
+    os.environ['LOANPRO_DATABASE_URI'] = f"sqlite:///{os.path.join(scratch, 'plans.db')}"
+
+    from sqlalchemy import event
+    from app import app, db, init_db, LoanApplication, application_listing
+
+    init_db()
+    app.config['RATE_LIMITS'] = {}
+
+    captured = []
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')) and not executemany:
+            captured.append((statement, parameters))
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+
+    failures = 0
+    app_id = None
+    raw = engine.raw_connection()
+    try:
+        tables = {row[0] for row in raw.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for label, method, url, data, allowed in ROUTES:
+            if data == 'APPLICATION_FORM':
+                data = APPLICATION_FORM
+            elif data:
+                data = {key: value.format(app_id=app_id) for key, value in data.items()}
+            captured.clear()
+            response = client.open(url.format(app_id=app_id), method=method, data=data)
+            statements = list(captured)
+            if app_id is None:
+                with app.app_context():
+                    app_id = LoanApplication.query.first().application_id
+                    # The first load of the in-memory listing reads every row by design;
+                    # prime it so the routes below show its incremental query
+                    application_listing.refresh(db.session)
+            if response.status_code >= 400:
+                print(f"❌ {label}: HTTP {response.status_code}")
+                failures += 1
+                continue
+
+            scanned, unbounded = set(), set()
+            for statement, params in statements:
+                scans = full_scans(raw, statement, params, tables)
+                scanned.update(scans)
+                if allowed in _NEEDS_LIMIT and not _LIMIT.search(statement):
+                    unbounded.update(scans)
+
+            if unbounded:
+                print(f"❌ {label}: full scan of {', '.join(sorted(unbounded))} with no LIMIT")
+                failures += 1
+            elif scanned and allowed:
+                print(f"➖ {label}: full scan of {', '.join(sorted(scanned))} allowed ({allowed})")
+            elif scanned:
+                print(f"❌ {label}: full scan of {', '.join(sorted(scanned))}")
+                failures += 1
+            else:
+                print(f"✅ {label}: {len(statements)} queries, all indexed")
+    finally:
+        raw.close()
+
+    if failures:
+        print(f"\n❌ {failures} route(s) fall back to full scans")
+        return 1
+    print("\n✅ Every route query uses an index or has a listed reason to scan")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
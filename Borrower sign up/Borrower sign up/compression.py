@@ -0,0 +1,151 @@
+"""
+Response compression for LoanPro
+Negotiates brotli or gzip from Accept-Encoding for HTML, JSON and other
+text responses, including streamed ones.
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - gzip is always available
+    brotli = None
+
+DEFAULT_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'image/svg+xml',
+}
+
+
+def choose_encoding(accept_encodings):
+    """Pick the best supported encoding the client accepts, or None"""
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    """Incremental compressor with a common interface for gzip and brotli"""
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._obj = brotli.Compressor(quality=min(level, 11))
+        else:
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def flush(self):
+        """Emit everything buffered so far so streamed chunks reach the client promptly"""
+        if self.encoding == 'br':
+            return self._obj.flush()
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._obj.finish()
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+def _compress_stream(chunks, compressor, close, flush_size):
+    try:
+        pending = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if not chunk:
+                continue
+            data = compressor.compress(chunk)
+            pending += len(chunk)
+            # Each flush ends a deflate block, so flushing every small chunk
+            # gives up most of the compression - wait for flush_size bytes
+            if pending >= flush_size:
+                data += compressor.flush()
+                pending = 0
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        if close is not None:
+            close()
+
+
+def compress_response(response, request, config):
+    """Compress a Flask response in place when the client and content allow it"""
+    if response.status_code != 200:
+        return response
+    if 'Content-Encoding' in response.headers or 'Range' in request.headers:
+        return response
+    if response.mimetype not in config['COMPRESS_MIMETYPES']:
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    min_size = config['COMPRESS_MIN_SIZE']
+    streamed = response.is_streamed or response.direct_passthrough
+    if streamed:
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+    # The compressed body is a different representation, so it gets its own
+    # ETag - and revalidation has to be checked against that tag, not the
+    # one the view (e.g. send_file) already compared
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+
+    # HEAD takes the same path so its headers match GET's; Werkzeug drops
+    # the body, so a streamed one is left unread rather than compressed
+    compressor = _Compressor(encoding, config['COMPRESS_LEVEL'])
+    if streamed:
+        response.headers.pop('Content-Length', None)
+        if request.method != 'HEAD':
+            close = getattr(response.response, 'close', None)
+            response.response = _compress_stream(response.response, compressor, close,
+                                                 config['COMPRESS_STREAM_FLUSH_SIZE'])
+            response.direct_passthrough = False
+    else:
+        response.set_data(compressor.compress(data) + compressor.finish())
+
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    """Compress eligible responses after every request"""
+    from flask import request
+
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    # Uncompressed bytes of a streamed response to buffer before each flush
+    app.config.setdefault('COMPRESS_STREAM_FLUSH_SIZE', 8192)
+    app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, request, app.config)
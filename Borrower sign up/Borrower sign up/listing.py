@@ -0,0 +1,255 @@
+"""
+In-memory listing of loan applications for LoanPro
+The admin list, dashboard and /view-all-applications only need a dozen
+columns per application. This keeps those columns in compact __slots__
+rows and refreshes them incrementally from the updated_at index, so
+filtering, sorting and counting run in memory instead of building a full
+ORM object (and its eligibility relationship) for every row on every request.
+Rows inserted behind the watermark show up in MAX(id), and deletes in the
+counter that migration 6's trigger keeps, so a refresh never counts rows.
+"""
+
+import heapq
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+# Rows updated this close to the watermark are re-read on every refresh, to
+# pick up transactions that committed slightly out of timestamp order
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+_SELECT = """
+    SELECT la.id, la.application_id, la.first_name, la.last_name, la.email, la.phone,
+           la.status, la.loan_amount_paise, la.annual_income_paise, ec.percentage,
+           la.created_at, la.updated_at
+"""
+
+_COLUMNS = _SELECT + """
+    FROM loan_applications la
+    LEFT JOIN eligibility_checks ec ON ec.application_id = la.id
+"""
+
+# Both are single-row lookups: MAX(id) reads the end of the rowid b-tree
+_CHANGE_SIGNAL = """
+    SELECT (SELECT MAX(id) FROM loan_applications),
+           (SELECT deleted FROM loan_application_deletes WHERE id = 1)
+"""
+
+# CROSS JOIN makes SQLite walk eligibility_checks first, in percentage order
+# straight off ix_eligibility_checks_percentage_application_id, and stop at
+# the LIMIT instead of sorting every matching application
+_BY_ELIGIBILITY = _SELECT + """
+    FROM eligibility_checks ec
+    CROSS JOIN loan_applications la ON la.id = ec.application_id
+"""
+
+
+class ListingRow:
+    """One application as shown in the admin listings"""
+
+    __slots__ = ('id', 'application_id', 'first_name', 'last_name', 'email', 'phone',
+                 'status', 'loan_amount_paise', 'annual_income_paise', 'eligibility_percentage',
+                 'created_at', 'updated_at', 'search_text')
+
+    def __init__(self, row):
+        (self.id, self.application_id, self.first_name, self.last_name, self.email, self.phone,
+         self.status, self.loan_amount_paise, self.annual_income_paise, self.eligibility_percentage,
+         created_at, self.updated_at) = row
+        self.created_at = _parse_datetime(created_at)
+        # Fields the admin search box matches, lowercased once here
+        self.search_text = '\x00'.join(
+            (self.first_name, self.last_name, self.email, self.application_id)
+        ).lower()
+
+    def sort_key(self):
+        return (self.created_at or datetime.min, self.id)
+
+    def same_as(self, other):
+        return (self.updated_at == other.updated_at and self.status == other.status
+                and self.eligibility_percentage == other.eligibility_percentage)
+
+
+class ApplicationListing:
+    """Snapshot of every application's listing columns, newest first.
+
+    Call refresh() with a session before reading; it only fetches rows whose
+    updated_at moved since the last call, and reloads everything if MAX(id)
+    shows an application was inserted behind the watermark or the delete
+    counter moved.
+
+    Readers take the (rows, counts) snapshot without the lock, so refresh
+    builds new rows, tuples and dicts and swaps them in - it never mutates
+    anything in a published snapshot. _rows is only used under the lock.
+    """
+
+    def __init__(self, overlap=WATERMARK_OVERLAP):
+        self.overlap = overlap
+        self._rows = {}
+        self._snapshot = ((), {})
+        self._watermark = None
+        self._max_id = 0
+        self._deleted = None
+        self._lock = threading.Lock()
+
+    def refresh(self, session):
+        with self._lock:
+            if self._watermark is not None:
+                changed, watermark = self._fetch(session, self._watermark)
+                # Drop rows re-read only because of the overlap window
+                changed = [row for row in changed
+                           if row.id not in self._rows or not self._rows[row.id].same_as(row)]
+                max_id, deleted = session.execute(text(_CHANGE_SIGNAL)).one()
+                seen_max_id = max([self._max_id] + [row.id for row in changed])
+                if deleted == self._deleted and (max_id or 0) == seen_max_id:
+                    if changed:
+                        self._merge(changed, watermark)
+                    return
+            # Read the delete counter first, so a delete during the reload forces another
+            _max_id, deleted = session.execute(text(_CHANGE_SIGNAL)).one()
+            fetched, watermark = self._fetch(session, None)
+            self._publish({row.id: row for row in fetched}, watermark, deleted)
+
+    def _fetch(self, session, watermark):
+        if watermark is None:
+            result = session.execute(text(_COLUMNS))
+        else:
+            since = (_parse_datetime(watermark) - self.overlap).strftime('%Y-%m-%d %H:%M:%S.%f')
+            result = session.execute(text(_COLUMNS + " WHERE la.updated_at >= :since"), {'since': since})
+
+        rows = []
+        for row in result:
+            listing_row = ListingRow(row)
+            rows.append(listing_row)
+            if listing_row.updated_at and (watermark is None or listing_row.updated_at > watermark):
+                watermark = listing_row.updated_at
+        return rows, watermark
+
+    def _publish(self, rows, watermark, deleted):
+        ordered = sorted(rows.values(), key=ListingRow.sort_key, reverse=True)
+        counts = {}
+        for row in ordered:
+            counts[row.status] = counts.get(row.status, 0) + 1
+        self._rows = rows
+        self._watermark = watermark
+        self._max_id = max(rows, default=0)
+        self._deleted = deleted
+        self._snapshot = (tuple(ordered), counts)
+
+    def _merge(self, changed, watermark):
+        """Apply changed rows without re-sorting or recounting the whole listing"""
+        previous, counts = self._snapshot
+        ordered = list(previous)
+        counts = dict(counts)
+        added = []
+        for row in changed:
+            current = self._rows.get(row.id)
+            self._rows[row.id] = row
+            if current is None:
+                added.append(row)
+            else:
+                # created_at never changes, so the new row takes the old one's place
+                counts[current.status] -= 1
+                ordered[_position(ordered, current)] = row
+            counts[row.status] = counts.get(row.status, 0) + 1
+
+        if added:
+            added.sort(key=ListingRow.sort_key, reverse=True)
+            self._max_id = max(self._max_id, max(row.id for row in added))
+            if not ordered or added[-1].sort_key() > ordered[0].sort_key():
+                # The usual case - new applications are the newest
+                ordered = added + ordered
+            else:
+                ordered = list(heapq.merge(added, ordered, key=ListingRow.sort_key, reverse=True))
+        self._watermark = watermark
+        self._snapshot = (tuple(ordered), counts)
+
+    def applications(self, status=None, search=None, limit=None, min_percentage=None, max_percentage=None):
+        """Rows newest first, optionally filtered by status, eligibility range and a substring search"""
+        result, _counts = self._snapshot
+        if status:
+            result = [row for row in result if row.status == status]
+        if min_percentage is not None or max_percentage is not None:
+            result = [row for row in result if _in_range(row.eligibility_percentage, min_percentage, max_percentage)]
+        if search:
+            needle = search.lower()
+            result = [row for row in result if needle in row.search_text]
+        return list(result[:limit] if limit is not None else result)
+
+    def counts(self):
+        """Number of applications per status, plus 'total'"""
+        ordered, counts = self._snapshot
+        counts = dict(counts)
+        counts['total'] = len(ordered)
+        return counts
+
+    def clear(self):
+        with self._lock:
+            self._rows = {}
+            self._snapshot = ((), {})
+            self._watermark = None
+            self._max_id = 0
+            self._deleted = None
+
+
+def by_eligibility(session, status=None, min_percentage=None, max_percentage=None,
+                   ascending=False, limit=None, offset=0, search=None):
+    """Applications ordered by eligibility percentage, best first unless ascending.
+
+    min_percentage is inclusive and max_percentage exclusive. Runs in SQL on
+    the (percentage, application_id) index rather than the in-memory listing,
+    so the top few rows come back without touching the rest of the table.
+    Applications without an eligibility check are left out. search matches
+    name, email and application ID like ApplicationListing.applications().
+    """
+    conditions, params = [], {}
+    if min_percentage is not None:
+        conditions.append("ec.percentage >= :min_percentage")
+        params['min_percentage'] = min_percentage
+    if max_percentage is not None:
+        conditions.append("ec.percentage < :max_percentage")
+        params['max_percentage'] = max_percentage
+    if status:
+        conditions.append("la.status = :status")
+        params['status'] = status
+    if search:
+        conditions.append(
+            "instr(lower(la.first_name || char(0) || la.last_name || char(0) || la.email"
+            " || char(0) || la.application_id), :search) > 0"
+        )
+        params['search'] = search.lower()
+
+    direction = 'ASC' if ascending else 'DESC'
+    sql = _BY_ELIGIBILITY
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY ec.percentage {direction}, ec.application_id {direction}"
+    if limit is not None:
+        sql += " LIMIT :limit OFFSET :offset"
+        params.update({'limit': limit, 'offset': offset})
+    return [ListingRow(row) for row in session.execute(text(sql), params)]
+
+
+def _position(ordered, row):
+    """Index of row in a newest-first sequence, by binary search on its sort key"""
+    key = row.sort_key()
+    low, high = 0, len(ordered)
+    while low < high:
+        middle = (low + high) // 2
+        if ordered[middle].sort_key() > key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _in_range(value, low, high):
+    if value is None:
+        return False
+    return (low is None or value >= low) and (high is None or value < high)
+
+
+def _parse_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
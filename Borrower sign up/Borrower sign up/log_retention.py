@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Retention and archiving for application_logs
+Moves log rows older than the retention age into gzip-compressed,
+append-only JSON-lines segments (one per month), and reads across the
+live table and the archive as if they were one.
+
+Usage:
+    python log_retention.py                 # archive logs older than LOG_RETENTION_DAYS
+    python log_retention.py --days 90       # override the retention age
+    python log_retention.py --compact       # also rewrite segments into a single gzip member
+    python log_retention.py --vacuum        # also VACUUM the database afterwards
+"""
+
+import glob
+import gzip
+import json
+import os
+import sys
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, Integer, String, Text, bindparam, text
+
+SEGMENT_PREFIX = 'application_logs-'
+SEGMENT_SUFFIX = '.jsonl.gz'
+BATCH_SIZE = 5000
+
+_LOG_COLUMNS = dict(id=Integer, application_id=Integer, action=String, details=Text, timestamp=DateTime)
+
+
+def segment_path(archive_dir, month):
+    """Archive file for a 'YYYY-MM' month"""
+    return os.path.join(archive_dir, f"{SEGMENT_PREFIX}{month}{SEGMENT_SUFFIX}")
+
+
+def _segment_month(path):
+    name = os.path.basename(path)
+    return name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+
+
+def _row_to_record(row):
+    return {
+        'id': row['id'],
+        'application_id': row['application_id'],
+        'action': row['action'],
+        'details': row['details'],
+        'timestamp': row['timestamp'].isoformat() if row['timestamp'] else None,
+    }
+
+
+def archive_logs(session, archive_dir, older_than_days, batch_size=BATCH_SIZE):
+    """Move logs older than the cutoff into monthly archive segments.
+
+    Rows are appended to their segment before being deleted, one batch per
+    transaction. A crash in between can leave a row in both places; readers
+    de-duplicate on the log id, so this is safe to re-run.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    select_batch = text(
+        "SELECT id, application_id, action, details, timestamp FROM application_logs "
+        "WHERE timestamp < :cutoff ORDER BY id LIMIT :limit"
+    ).bindparams(bindparam('cutoff', type_=DateTime)).columns(**_LOG_COLUMNS)
+
+    archived = 0
+    while True:
+        rows = session.execute(select_batch, {'cutoff': cutoff, 'limit': batch_size}).mappings().all()
+        if not rows:
+            break
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row['timestamp'].strftime('%Y-%m'), []).append(_row_to_record(row))
+
+        for month, records in by_month.items():
+            # Appending adds a new gzip member; gzip readers see one continuous stream
+            with gzip.open(segment_path(archive_dir, month), 'at', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+        ids = [row['id'] for row in rows]
+        session.execute(
+            text("DELETE FROM application_logs WHERE id IN :ids").bindparams(bindparam('ids', expanding=True)),
+            {'ids': ids}
+        )
+        session.commit()
+        archived += len(rows)
+
+    return archived
+
+
+def _read_segment(path):
+    """Records in a segment, stopping cleanly at a truncated trailing member.
+
+    archive_logs may be appending a member while this reads (or crashed
+    part-way through one). Those rows are only deleted from the live table
+    after the append is synced, and query_logs reads the live table first,
+    so nothing is lost by stopping early.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # cut off mid-record
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            return
+
+
+def compact_archives(archive_dir):
+    """Rewrite each segment as a single gzip member with duplicate rows removed"""
+    compacted = 0
+    for path in sorted(glob.glob(os.path.join(archive_dir, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))):
+        records = {record['id']: record for record in _read_segment(path)}
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=9) as f:
+            for log_id in sorted(records):
+                f.write(json.dumps(records[log_id], separators=(',', ':')) + '\n')
+        os.replace(tmp_path, path)
+        compacted += 1
+    return compacted
+
+
+def query_logs(session, archive_dir, start=None, end=None, application_id=None, action=None,
+               before=None, limit=None):
+    """Logs with start <= timestamp < end from both the live table and the archive.
+
+    Returns dicts ordered by timestamp (oldest first). application_id is the
+    numeric loan_applications.id, as stored on the log rows; action may be a
+    single action or a list of them. `before` is a (timestamp, id) keyset
+    position - only logs strictly older are returned. With `limit`, only the
+    newest `limit` matching logs are returned, and archive segments are read
+    newest month first, stopping once older months cannot contribute.
+    """
+    conditions, params = [], {}
+    binds = []
+    if start is not None:
+        conditions.append("timestamp >= :start")
+        params['start'] = start
+        binds.append(bindparam('start', type_=DateTime))
+    if end is not None:
+        conditions.append("timestamp < :end")
+        params['end'] = end
+        binds.append(bindparam('end', type_=DateTime))
+    if before is not None:
+        conditions.append("(timestamp < :before_ts OR (timestamp = :before_ts AND id < :before_id))")
+        params['before_ts'], params['before_id'] = before
+        binds.append(bindparam('before_ts', type_=DateTime))
+    if application_id is not None:
+        conditions.append("application_id = :application_id")
+        params['application_id'] = application_id
+    actions = None
+    if action is not None:
+        actions = [action] if isinstance(action, str) else list(action)
+        conditions.append("action IN :actions")
+        params['actions'] = actions
+        binds.append(bindparam('actions', expanding=True))
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    order = "ORDER BY timestamp DESC, id DESC LIMIT :limit" if limit is not None else ''
+    if limit is not None:
+        params['limit'] = limit
+    live = text(
+        f"SELECT id, application_id, action, details, timestamp FROM application_logs {where} {order}"
+    ).bindparams(*binds).columns(**_LOG_COLUMNS)
+
+    results = {row['id']: _row_to_record(row) for row in session.execute(live, params).mappings()}
+
+    first_month = start.strftime('%Y-%m') if start else None
+    last_month = min(filter(None, [end, before[0] if before else None]), default=None)
+    last_month = last_month.strftime('%Y-%m') if last_month else None
+
+    segments = sorted(glob.glob(os.path.join(archive_dir, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")), reverse=True)
+    for path in segments:
+        month = _segment_month(path)
+        if (first_month and month < first_month) or (last_month and month > last_month):
+            continue
+        if limit is not None and sum(1 for r in results.values() if r['timestamp'][:7] > month) >= limit:
+            # Everything in this and older segments is older than `limit` logs already found
+            break
+        for record in _read_segment(path):
+            if record['id'] in results:
+                continue
+            timestamp = datetime.fromisoformat(record['timestamp'])
+            if (start and timestamp < start) or (end and timestamp >= end):
+                continue
+            if before is not None and (timestamp, record['id']) >= tuple(before):
+                continue
+            if application_id is not None and record['application_id'] != application_id:
+                continue
+            if actions is not None and record['action'] not in actions:
+                continue
+            results[record['id']] = record
+
+    ordered = sorted(results.values(), key=lambda record: (record['timestamp'] or '', record['id']))
+    if limit is not None:
+        ordered = ordered[max(len(ordered) - limit, 0):]
+    return ordered
+
+
+def main(argv=None):
+    import argparse
+    from app import app, db
+
+    parser = argparse.ArgumentParser(description='Archive old application logs')
+    parser.add_argument('--days', type=int, default=app.config['LOG_RETENTION_DAYS'],
+                        help='archive logs older than this many days')
+    parser.add_argument('--compact', action='store_true', help='compact archive segments afterwards')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM the database afterwards')
+    args = parser.parse_args(argv)
+
+    archive_dir = app.config['LOG_ARCHIVE_DIR']
+    with app.app_context():
+        print(f"🗄️  Archiving logs older than {args.days} days to {archive_dir}")
+        archived = archive_logs(db.session, archive_dir, args.days)
+        print(f"✅ Archived {archived} log rows")
+
+        if args.compact:
+            print(f"✅ Compacted {compact_archives(archive_dir)} archive segments")
+
+        if args.vacuum:
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql("VACUUM")
+            print("✅ Database vacuumed")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Schema migrations for LoanPro
+A small versioned migration runner for the SQLite database. The schema
+version lives in PRAGMA user_version; each migration runs in its own short
+transaction and bumps it, and applied migrations are recorded in
+schema_migrations.
+
+Migrations use plain SQL rather than the models, so they keep working as
+the models change. Index migrations use IF NOT EXISTS so fresh databases
+(where create_all already built the indexes) pass through them instantly.
+
+Usage:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # show current and latest version
+"""
+
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+import money
+
+
+def _money_to_paise(conn):
+    money.migrate_money_to_paise(conn)
+
+
+def _index_migration(*statements):
+    def apply(conn):
+        for statement in statements:
+            conn.execute(statement)
+    return apply
+
+
+# (version, name, function(connection)) - append only, never renumber
+MIGRATIONS = [
+    (1, 'money_to_paise', _money_to_paise),
+    (2, 'application_log_indexes', _index_migration(
+        "CREATE INDEX IF NOT EXISTS ix_application_logs_application_id_timestamp "
+        "ON application_logs (application_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_application_logs_timestamp ON application_logs (timestamp)",
+    )),
+    (3, 'loan_application_indexes', _index_migration(
+        "CREATE INDEX IF NOT EXISTS ix_loan_applications_status_created_at "
+        "ON loan_applications (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_loan_applications_created_at ON loan_applications (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_loan_applications_updated_at ON loan_applications (updated_at)",
+        "CREATE INDEX IF NOT EXISTS ix_loan_applications_email ON loan_applications (email)",
+    )),
+    (4, 'eligibility_check_indexes', _index_migration(
+        "CREATE INDEX IF NOT EXISTS ix_eligibility_checks_application_id ON eligibility_checks (application_id)",
+        "CREATE INDEX IF NOT EXISTS ix_eligibility_checks_percentage ON eligibility_checks (percentage)",
+    )),
+    # Covers "best eligibility first" listings; supersedes the plain percentage index
+    (5, 'eligibility_percentage_covering_index', _index_migration(
+        "CREATE INDEX IF NOT EXISTS ix_eligibility_checks_percentage_application_id "
+        "ON eligibility_checks (percentage, application_id)",
+        "DROP INDEX IF EXISTS ix_eligibility_checks_percentage",
+    )),
+    # Lets the in-memory listing notice deletes without counting every row
+    (6, 'loan_application_delete_counter', _index_migration(
+        "CREATE TABLE IF NOT EXISTS loan_application_deletes ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), deleted INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO loan_application_deletes (id, deleted) VALUES (1, 0)",
+        "CREATE TRIGGER IF NOT EXISTS loan_applications_count_deletes AFTER DELETE ON loan_applications "
+        "BEGIN UPDATE loan_application_deletes SET deleted = deleted + 1 WHERE id = 1; END",
+    )),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def schema_is_current(db_path):
+    """True if db_path exists and is already at LATEST_VERSION - one PRAGMA, no table checks"""
+    if not db_path or not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        return current_version(conn) >= LATEST_VERSION
+    finally:
+        conn.close()
+
+
+def migrate(db_path, verbose=True, timeout=30):
+    """Apply every migration newer than the database's user_version.
+
+    SQLite holds the write lock while an index is built, so each migration
+    commits on its own rather than in one long transaction; under WAL,
+    readers carry on throughout. Returns the list of applied names.
+    """
+    applied = []
+    # Autocommit mode so we issue BEGIN IMMEDIATE ourselves
+    conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+    try:
+        if current_version(conn) >= LATEST_VERSION:
+            return applied
+
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TEXT NOT NULL)"
+        )
+
+        for version, name, apply in MIGRATIONS:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-read under the write lock - another worker may have got here first
+                if current_version(conn) >= version:
+                    conn.execute("ROLLBACK")
+                    continue
+                apply(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                    (version, name, datetime.utcnow().isoformat())
+                )
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(name)
+            if verbose:
+                print(f"✅ Applied migration {version}: {name}")
+    finally:
+        conn.close()
+
+    return applied
+
+
+def main(argv=None):
+    import argparse
+    from app import app, db
+
+    parser = argparse.ArgumentParser(description='Apply LoanPro schema migrations')
+    parser.add_argument('--status', action='store_true', help='show the schema version and exit')
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        db_path = db.engine.url.database
+        if args.status:
+            conn = sqlite3.connect(db_path)
+            try:
+                print(f"📋 Schema version {current_version(conn)} (latest {LATEST_VERSION})")
+            finally:
+                conn.close()
+            return 0
+
+        db.create_all()
+        applied = migrate(db_path)
+        if not applied:
+            print(f"✅ Schema is up to date (version {LATEST_VERSION})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Money helpers for LoanPro
+Amounts are stored and processed as integer paise (1 rupee = 100 paise), so
+scoring, aggregates and rendering never build Decimals or round floats.
+"""
+
+import re
+import sqlite3
+from decimal import Decimal, ROUND_HALF_UP
+
+PAISE_PER_RUPEE = 100
+
+_AMOUNT_RE = re.compile(r'(-?)(\d+)(?:\.(\d{0,2}))?')
+
+# ALTER TABLE ... DROP COLUMN arrived in SQLite 3.35; older builds rebuild the table
+_HAS_DROP_COLUMN = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def parse_rupees(value):
+    """Convert a rupee amount to integer paise.
+
+    Accepts ints, Decimals, floats and strings such as '150000', '1,50,000.50'
+    or '₹2500'. Raises ValueError for anything else, including strings with
+    more than two decimal places.
+    """
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f"Invalid amount: {value!r}")
+    if isinstance(value, int):
+        return value * PAISE_PER_RUPEE
+    if isinstance(value, float):
+        value = Decimal(repr(value))
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            raise ValueError(f"Invalid amount: {value!r}")
+        return int((value * PAISE_PER_RUPEE).to_integral_value(ROUND_HALF_UP))
+
+    text = str(value).strip().replace('₹', '').replace(',', '').strip()
+    match = _AMOUNT_RE.fullmatch(text)
+    if match is None:
+        raise ValueError(f"Invalid amount: {value!r}")
+    sign, whole, fraction = match.groups()
+    paise = int(whole) * PAISE_PER_RUPEE + int((fraction or '').ljust(2, '0'))
+    return -paise if sign else paise
+
+
+def format_paise(paise, decimals=2):
+    """Format paise as rupees: 15000050 -> '₹150,000.50' (decimals=0 -> '₹150,001')"""
+    if paise is None:
+        return "₹0"
+    sign = '-' if paise < 0 else ''
+    paise = abs(paise)
+    if decimals == 0:
+        return f"{sign}₹{(paise + PAISE_PER_RUPEE // 2) // PAISE_PER_RUPEE:,}"
+    rupees, remainder = divmod(paise, PAISE_PER_RUPEE)
+    return f"{sign}₹{rupees:,}.{remainder:02d}"
+
+
+def rupees(paise):
+    """Rupee value for JSON output - an int when there are no paise"""
+    if paise is None:
+        return None
+    whole, remainder = divmod(paise, PAISE_PER_RUPEE)
+    return whole if remainder == 0 else paise / PAISE_PER_RUPEE
+
+
+def migrate_money_to_paise(connection):
+    """Replace the old Numeric rupee columns with integer paise columns.
+
+    Only touches a loan_applications table that still has the old columns.
+    Takes a sqlite3 connection; run it inside a transaction (see migrations.py).
+    """
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(loan_applications)")}
+    migrated = []
+    for name in ('annual_income', 'loan_amount'):
+        if name not in columns:
+            continue
+        if f"{name}_paise" not in columns:
+            connection.execute(
+                f"ALTER TABLE loan_applications ADD COLUMN {name}_paise INTEGER NOT NULL DEFAULT 0"
+            )
+        connection.execute(
+            f"UPDATE loan_applications SET {name}_paise = CAST(ROUND({name} * 100) AS INTEGER)"
+        )
+        if _HAS_DROP_COLUMN:
+            connection.execute(f"ALTER TABLE loan_applications DROP COLUMN {name}")
+        migrated.append(name)
+    if migrated and not _HAS_DROP_COLUMN:
+        _drop_columns(connection, 'loan_applications', migrated)
+    return migrated
+
+
+def _drop_columns(connection, table, names):
+    """DROP COLUMN for SQLite before 3.35: copy the other columns into a new
+    table, drop the old one and rename the copy, then recreate its indexes"""
+    create_sql = connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    index_sqls = [row[0] for row in connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+    )]
+
+    start, end = create_sql.index('('), create_sql.rindex(')')
+    definitions = [d for d in _split_definitions(create_sql[start + 1:end])
+                   if d.split()[0].strip('"`[]') not in names]
+    kept = [row[1] for row in connection.execute(f"PRAGMA table_info({table})") if row[1] not in names]
+    column_list = ', '.join(f'"{column}"' for column in kept)
+
+    connection.execute(f"CREATE TABLE {table}_new ({', '.join(definitions)})")
+    connection.execute(f"INSERT INTO {table}_new ({column_list}) SELECT {column_list} FROM {table}")
+    connection.execute(f"DROP TABLE {table}")
+    connection.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    for index_sql in index_sqls:
+        connection.execute(index_sql)
+
+
+def _split_definitions(body):
+    """Split a CREATE TABLE body on top-level commas - NUMERIC(12, 2) stays whole"""
+    definitions, depth, current = [], 0, ''
+    for char in body:
+        if char == ',' and depth == 0:
+            definitions.append(current.strip())
+            current = ''
+            continue
+        depth += (char == '(') - (char == ')')
+        current += char
+    if current.strip():
+        definitions.append(current.strip())
+    return definitions
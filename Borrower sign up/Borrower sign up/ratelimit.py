@@ -0,0 +1,136 @@
+"""
+Admission control for LoanPro
+Token buckets shared by every worker through a small local SQLite file,
+plus a negative cache for application IDs that are known not to exist.
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Idle buckets are deleted every this many allow() calls per process
+PURGE_EVERY = 1000
+
+
+class TokenBucketLimiter:
+    """Token bucket per (client, route) kept in a local file shared by all workers"""
+
+    def __init__(self, path='ratelimit.db', timeout=1.0, purge_every=PURGE_EVERY):
+        self.path = os.path.abspath(path)
+        self.timeout = timeout
+        self.purge_every = purge_every
+        self._calls = itertools.count(1)
+        # Connected on first use, so importing the app never touches the file
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None so we control BEGIN IMMEDIATE ourselves
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._init_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_buckets_updated ON buckets (updated)")
+
+    def allow(self, key, rate, burst):
+        """Take one token from the bucket for key.
+
+        rate is tokens refilled per second and burst is the bucket size.
+        Returns (allowed, retry_after_seconds).
+        """
+        if self.purge_every and next(self._calls) % self.purge_every == 0:
+            self.purge()
+
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            # Limiter file is busy - fail open rather than block the request
+            return True, 0
+
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                tokens = float(burst)
+            else:
+                tokens = min(float(burst), row[0] + (now - row[1]) * rate)
+
+            if tokens >= 1:
+                allowed, retry_after = True, 0
+                tokens -= 1
+            else:
+                allowed, retry_after = False, (1 - tokens) / rate
+
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            return True, 0
+
+        return allowed, retry_after
+
+    def purge(self, max_idle=3600):
+        """Drop buckets that have been idle (and therefore full) for max_idle seconds.
+
+        max_idle must be longer than the slowest bucket takes to refill.
+        """
+        try:
+            cursor = self._connect().execute("DELETE FROM buckets WHERE updated < ?", (time.time() - max_idle,))
+        except sqlite3.Error:
+            return 0  # busy - the next purge will catch up
+        return cursor.rowcount
+
+
+class NegativeCache:
+    """Bounded, per-process TTL cache of keys recently found to be missing"""
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False
+            return True
+
+    def add(self, key):
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
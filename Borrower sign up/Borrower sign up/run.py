@@ -5,21 +5,20 @@ LoanPro Application Runner
 
 import os
 import sys
-from app import app, init_db
+from app import app, init_db, start_backup_scheduler
 
 def main():
     """Main function to run the application"""
     
-    # Initialize database if it doesn't exist
-    if not os.path.exists('loanpro.db'):
-        print("Initializing database...")
-        init_db()
-        print("Database initialized successfully!")
+    # Create or migrate the database - returns immediately if the schema is current
+    init_db()
     
     # Set environment variables if not set
     if not os.environ.get('SECRET_KEY'):
         os.environ['SECRET_KEY'] = 'dev-secret-key-change-in-production'
     
+    start_backup_scheduler()
+    
     # Run the application
     print("Starting LoanPro Application...")
     print("Access the application at: http://localhost:5000")
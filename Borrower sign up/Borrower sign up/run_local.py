@@ -6,36 +6,14 @@ No network dependencies - all data stored locally
 
 import os
 import sys
-import sqlite3
-from app import app, init_db
+from app import app, db, init_db, start_backup_scheduler
 
 def check_database():
-    """Check if database exists and show stats"""
-    db_path = 'loanpro.db'
-    
+    """Show where the database is - application counts are on the admin dashboard"""
+    with app.app_context():
+        db_path = db.engine.url.database
     if os.path.exists(db_path):
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM loan_applications")
-            app_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM loan_applications WHERE status = 'pending'")
-            pending_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM loan_applications WHERE status = 'approved'")
-            approved_count = cursor.fetchone()[0]
-            
-            print(f"📊 Database Status:")
-            print(f"   Total Applications: {app_count}")
-            print(f"   Pending: {pending_count}")
-            print(f"   Approved: {approved_count}")
-            
-            conn.close()
-            
-        except Exception as e:
-            print(f"⚠️  Database exists but error reading: {e}")
+        print(f"📁 Database: {db_path}")
     else:
         print("📁 Database will be created on first run")
 
@@ -53,12 +31,10 @@ def main():
     check_database()
     print()
     
-    # Initialize database if needed
-    if not os.path.exists('loanpro.db'):
-        print("🔧 Initializing database...")
-        init_db()
-        print("✅ Database initialized!")
-        print()
+    # Create or migrate the database - returns immediately if the schema is current
+    init_db()
+    
+    start_backup_scheduler()
     
     print("🌐 Application will be available at:")
     print("   🏠 Home Page: http://localhost:5000")
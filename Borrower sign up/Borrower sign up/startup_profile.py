@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Startup profile for LoanPro
+Reports which modules `import app` spends its time on (via python -X
+importtime) and measures cold start - a fresh interpreter importing the
+app, running init_db on a scratch copy of the database and serving its
+first request - against a target.
+Exits non-zero if the median cold start misses the target.
+
+Usage:
+    python startup_profile.py                  # top 20 imports + cold start
+    python startup_profile.py --top 40 --runs 10 --target-ms 500
+"""
+
+import json
+import os
+import re
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Autoscaled workers should be serving well inside a second
+COLD_START_TARGET_MS = 750
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+_COLD_START = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.init_db()
+initialised = time.perf_counter()
+response = app.app.test_client().get('/')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'init_db_ms': (initialised - imported) * 1000,
+    'first_request_ms': (served - initialised) * 1000,
+    'total_ms': (served - started) * 1000,
+    'status': response.status_code,
+}))
+"""
+
+
+def import_times():
+    """(module, self ms, cumulative ms, depth) for every module `import app` loads"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=HERE, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return modules
+
+
+def cold_start(runs):
+    """Time `runs` fresh interpreters from start to first response.
+
+    init_db may migrate, so the runs use a scratch copy of instance/loanpro.db
+    (or an empty database if there is none) rather than the real one.
+    """
+    scratch = tempfile.mkdtemp(prefix='loanpro-startup-')
+    try:
+        db_path = os.path.join(scratch, 'loanpro.db')
+        source = os.path.join(HERE, 'instance', 'loanpro.db')
+        if os.path.exists(source):
+            # The backup API gives a consistent copy even while the app is writing
+            src, dest = sqlite3.connect(source), sqlite3.connect(db_path)
+            try:
+                src.backup(dest)
+            finally:
+                dest.close()
+                src.close()
+        env = dict(os.environ, LOANPRO_DATABASE_URI=f"sqlite:///{db_path}")
+
+        samples = []
+        for _ in range(runs):
+            result = subprocess.run(
+                [sys.executable, '-c', _COLD_START],
+                cwd=HERE, env=env, capture_output=True, text=True, check=True
+            )
+            samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        return samples
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Profile LoanPro import time and cold start')
+    parser.add_argument('--top', type=int, default=20, help='number of modules to list')
+    parser.add_argument('--runs', type=int, default=5, help='cold starts to measure')
+    parser.add_argument('--target-ms', type=float, default=COLD_START_TARGET_MS,
+                        help=f'cold start target (default {COLD_START_TARGET_MS} ms)')
+    args = parser.parse_args(argv)
+
+    modules = import_times()
+    local = {os.path.splitext(name)[0] for name in os.listdir(HERE) if name.endswith('.py')}
+
+    print(f"📦 Slowest imports under `import app` (cumulative ms)")
+    top_level = [m for m in modules if m[3] == 1]
+    for name, self_ms, cumulative_ms, _depth in sorted(top_level, key=lambda m: -m[2])[:args.top]:
+        marker = '🏠' if name in local else '  '
+        print(f"   {marker} {cumulative_ms:8.1f}  {name}")
+    own = sum(m[2] for m in top_level if m[0] in local)
+    total = next((m[2] for m in modules if m[0] == 'app'), 0)
+    print(f"   LoanPro modules: {own:.1f} ms of {total:.1f} ms total")
+    print()
+
+    samples = cold_start(args.runs)
+    median = {key: statistics.median(s[key] for s in samples)
+              for key in ('import_ms', 'init_db_ms', 'first_request_ms', 'total_ms')}
+    print(f"⏱️  Cold start, median of {args.runs}:")
+    print(f"   import app     {median['import_ms']:8.1f} ms")
+    print(f"   init_db        {median['init_db_ms']:8.1f} ms")
+    print(f"   first request  {median['first_request_ms']:8.1f} ms")
+    print(f"   total          {median['total_ms']:8.1f} ms (target {args.target_ms:.0f} ms)")
+
+    if any(s['status'] != 200 for s in samples):
+        print("❌ First request did not return 200")
+        return 1
+    if median['total_ms'] > args.target_ms:
+        print(f"❌ Cold start is over target by {median['total_ms'] - args.target_ms:.1f} ms")
+        return 1
+    print("✅ Cold start within target")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Application validation for LoanPro
+Declarative rules for every field of a loan application. Patterns are
+compiled once at import, and validate_application() checks all fields in
+one pass, returning every error together instead of stopping at the first.
+
+The same rules back the apply form, the inline /api/validate-application
+endpoint and bulk checks of application files.
+
+Usage:
+    python validation.py applications.csv   # check every row, report all errors
+"""
+
+import csv
+import re
+import sys
+from datetime import date, datetime
+
+import money
+
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_RE = re.compile(r'[6-9]\d{9}')  # Indian mobile number
+
+# Application limits, in paise
+MIN_LOAN_PAISE = 10000_00
+MAX_LOAN_PAISE = 10000000_00  # 1 Crore
+MIN_INCOME_PAISE = 100000_00  # 1 Lakh
+
+MIN_AGE = 18
+MAX_AGE = 80
+
+
+def calculate_age(birth_date):
+    """Calculate age from birth date"""
+    today = date.today()
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def matches(pattern, message):
+    return lambda value: None if pattern.fullmatch(value) else message
+
+
+def at_least(minimum, message):
+    return lambda value: message if value < minimum else None
+
+
+def at_most(maximum, message):
+    return lambda value: message if value > maximum else None
+
+
+def age_between(minimum, maximum):
+    def check(dob):
+        age = calculate_age(dob)
+        if age < minimum:
+            return f'You must be at least {minimum} years old to apply'
+        if age > maximum:
+            return f'Maximum age limit is {maximum} years'
+        return None
+    return check
+
+
+class Field:
+    """A required form field: clean the raw string, parse it, then run checks"""
+
+    __slots__ = ('name', 'label', 'clean', 'parse', 'parse_error', 'checks')
+
+    def __init__(self, name, clean=str.strip, parse=None, parse_error=None, checks=()):
+        self.name = name
+        self.label = name.replace('_', ' ').title()
+        self.clean = clean
+        self.parse = parse
+        self.parse_error = parse_error
+        self.checks = tuple(checks)
+
+    def validate(self, raw):
+        """Return (value, error) - error is None when the value is valid"""
+        if raw is None or raw == '':
+            return None, f'{self.label} is required'
+        # JSON and CSV callers send numbers; anything else that is not text is rejected
+        if isinstance(raw, bool) or not isinstance(raw, (str, int, float)):
+            return None, f'{self.label} is invalid'
+        value = self.clean(str(raw))
+        if value == '':
+            return None, f'{self.label} is required'
+        if self.parse is not None:
+            try:
+                value = self.parse(value)
+            except (TypeError, ValueError):
+                return None, self.parse_error
+        for check in self.checks:
+            error = check(value)
+            if error:
+                return None, error
+        return value, None
+
+
+APPLICATION_FIELDS = (
+    Field('first_name'),
+    Field('last_name'),
+    Field('email', clean=lambda value: value.strip().lower(),
+          checks=[matches(EMAIL_RE, 'Please enter a valid email address')]),
+    Field('phone', checks=[matches(PHONE_RE, 'Please enter a valid 10-digit phone number')]),
+    Field('date_of_birth', parse=_parse_date, parse_error='Please enter a valid date of birth',
+          checks=[age_between(MIN_AGE, MAX_AGE)]),
+    Field('address'),
+    Field('city'),
+    Field('state'),
+    Field('zip_code'),
+    Field('employment_status'),
+    Field('annual_income', parse=money.parse_rupees, parse_error='Please enter a valid annual income',
+          checks=[at_least(MIN_INCOME_PAISE, 'Minimum annual income required is ₹1,00,000')]),
+    Field('loan_amount', parse=money.parse_rupees, parse_error='Please enter a valid loan amount',
+          checks=[at_least(MIN_LOAN_PAISE, 'Minimum loan amount is ₹10,000'),
+                  at_most(MAX_LOAN_PAISE, 'Maximum loan amount is ₹1,00,00,000')]),
+    Field('loan_purpose'),
+)
+
+
+def validate_application(data, fields=None):
+    """Validate an application in one pass.
+
+    `data` is any mapping of field name to raw value (a form, a JSON body, a
+    CSV row). Pass `fields` to check only some of them, e.g. the one the user
+    just left. Returns (cleaned, errors): cleaned values (dates parsed,
+    amounts in paise) for valid fields, and a message per invalid field.
+    """
+    cleaned, errors = {}, {}
+    for field in APPLICATION_FIELDS:
+        if fields is not None and field.name not in fields:
+            continue
+        value, error = field.validate(data.get(field.name))
+        if error:
+            errors[field.name] = error
+        else:
+            cleaned[field.name] = value
+    return cleaned, errors
+
+
+def validate_many(records):
+    """Validate a batch of applications, yielding (index, cleaned, errors) for each"""
+    for index, record in enumerate(records):
+        cleaned, errors = validate_application(record)
+        yield index, cleaned, errors
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python validation.py applications.csv")
+        return 2
+
+    valid = invalid = 0
+    with open(argv[0], newline='', encoding='utf-8') as f:
+        # Row 1 is the header
+        for index, _cleaned, errors in validate_many(csv.DictReader(f)):
+            if errors:
+                invalid += 1
+                print(f"❌ Row {index + 2}:")
+                for name, message in errors.items():
+                    print(f"   {name}: {message}")
+            else:
+                valid += 1
+
+    print(f"\n📊 {valid} valid, {invalid} invalid")
+    return 1 if invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,7 @@ Simple script to view all data in the local database
 import sqlite3
 import os
 from datetime import datetime
+from money import format_paise
 
 def view_database():
     db_path = 'loanpro.db'
@@ -26,8 +27,8 @@ def view_database():
                 last_name,
                 email,
                 phone,
-                loan_amount,
-                annual_income,
+                loan_amount_paise,
+                annual_income_paise,
                 status,
                 created_at
             FROM loan_applications 
@@ -47,9 +48,9 @@ def view_database():
             print("-" * 100)
             
             for app in applications:
-                app_id, first_name, last_name, email, phone, loan_amount, annual_income, status, created_at = app
+                app_id, first_name, last_name, email, phone, loan_amount_paise, annual_income_paise, status, created_at = app
                 name = f"{first_name} {last_name}"
-                print(f"{app_id:<15} {name:<25} {email:<30} ₹{loan_amount:>12,.0f} {status:<12} {created_at:<20}")
+                print(f"{app_id:<15} {name:<25} {email:<30} {format_paise(loan_amount_paise, 0):>13} {status:<12} {created_at:<20}")
         else:
             print("No applications found in database.")
         